@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:27:08 2026
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import plum_des_simulation as plum
+from plum_kernel import make_kernel
+from plum_log import SimulationLogHandler
+from benchmarks.bench_multicast import dense_network
+
+
+'''
+Overhead of the messages of the sensors on a large network.
+'quiet' is the default (logger at WARNING, nothing is formatted), 'console'
+writes every message to a stream like the old print() calls did (to
+/dev/null here, so the terminal does not count), and 'simulation_log' keeps
+the messages in the SimulationLog of the run.
+
+Run from the repository root:
+    python -m benchmarks.bench_logging --sensors 5000
+'''
+def run(network, epicenter, duration, backend):
+    env = make_kernel(backend)
+    network.reset(env)
+    start = time.perf_counter()
+    plum.simulate_earthquake(env, epicenter, network.sensors)
+    env.run(duration)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Overhead of the sensor messages")
+    parser.add_argument('--sensors', type=int, default=5000)
+    parser.add_argument('--size-km', type=float, default=200)
+    parser.add_argument('--duration', type=float, default=120)
+    parser.add_argument('--backend', default='heap')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    network = dense_network(args.sensors, args.size_km)
+    epicenter = (-41.3, 175.4)
+
+    devnull = open(os.devnull, 'w')
+    console = logging.StreamHandler(devnull)
+    console.setFormatter(logging.Formatter('%(message)s'))
+    modes = {'quiet': (logging.WARNING, None),
+             'console': (logging.DEBUG, console),
+             'simulation_log': (logging.DEBUG, SimulationLogHandler())}
+
+    print(f"{args.sensors} sensors in {args.size_km:g} km x {args.size_km:g} km, {args.backend} backend")
+    print(f"{'mode':<16}{'wall_s':>10}{'messages':>10}")
+    results = {}
+    for mode, (level, handler) in modes.items():
+        plum.set_log_level(level, handler)
+        results[mode] = min(run(network, epicenter, args.duration, args.backend) for _ in range(args.repeat))
+        if handler is not None:
+            plum.logger.removeHandler(handler)
+        print(f"{mode:<16}{results[mode]:>10.3f}{len(network.log.messages):>10}")
+    plum.set_log_level(logging.WARNING)
+    removed = 1 - results['quiet'] / results['console']
+    print(f"quiet logger saves {removed:.0%} of the run time of console output")
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:21:15 2026
+"""
+
+import argparse
+import time
+
+import plum_des_simulation as plum
+from plum_kernel import SimPyKernel
+from plum_synthetic import synthetic_network
+
+
+'''
+Benchmark of the broadcast delivery paths on a dense network.
+'unicast' is the old path (one SimPy process and timeout per receiver) and
+'multicast' schedules one event per broadcast. For each path the benchmark
+reports the number of scheduled events, the largest size of the event queue
+and the wall time of the run.
+
+Run from the repository root:
+    python -m benchmarks.bench_multicast --sensors 1000
+'''
+class CountingEnvironment(SimPyKernel):
+    def __init__(self):
+        super().__init__()
+        self.events = 0
+        self.max_queue = 0
+
+    def schedule(self, event, priority=1, delay=0):
+        super().schedule(event, priority, delay)
+        self.events += 1
+        self.max_queue = max(self.max_queue, len(self._queue))
+
+
+# n sensors spread uniformly in a square of size_km x size_km
+def dense_network(n, size_km=40, multicast=True):
+    return synthetic_network(n, density=n / size_km ** 2, centre=(-41.0, 175.0), multicast=multicast)
+
+
+def run(network, epicenter, duration):
+    env = CountingEnvironment()
+    network.reset(env)
+
+    start = time.perf_counter()
+    plum.simulate_earthquake(env, epicenter, network.sensors)
+    env.run(duration)
+    wall = time.perf_counter() - start
+    return {'events': env.events, 'max_queue': env.max_queue,
+            'wall_s': wall, 'log_rows': len(network.log)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Unicast vs multicast broadcast delivery")
+    parser.add_argument('--sensors', type=int, default=1000)
+    parser.add_argument('--size-km', type=float, default=40)
+    parser.add_argument('--duration', type=float, default=120)
+    args = parser.parse_args()
+
+    network = dense_network(args.sensors, args.size_km)
+    epicenter = (-41.3, 175.4)
+    print(f"{args.sensors} sensors in {args.size_km:g} km x {args.size_km:g} km")
+    print(f"{'path':<10}{'events':>12}{'max_queue':>12}{'wall_s':>10}{'log_rows':>10}")
+    results = {}
+    for name, multicast in (('unicast', False), ('multicast', True)):
+        network.multicast = multicast
+        results[name] = run(network, epicenter, args.duration)
+        r = results[name]
+        print(f"{name:<10}{r['events']:>12}{r['max_queue']:>12}{r['wall_s']:>10.3f}{r['log_rows']:>10}")
+    if results['unicast']['log_rows'] != results['multicast']['log_rows']:
+        raise SystemExit("Both paths should log the same number of rows")
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:28:40 2026
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+
+import plum_des_simulation as plum
+from plum_kernel import make_kernel
+from plum_log import NullSink, SimulationLog
+from plum_synthetic import synthetic_network
+
+
+'''
+Scaling benchmark on synthetic networks.
+For every number of sensors and density (sensors per km^2, see
+plum_synthetic) a network is built and one earthquake at the centre of the
+region is simulated end to end. Each case runs in a fresh process, so the
+peak RSS is the peak of that case only. The log goes to a NullSink.
+
+The results are written as JSON (see --output) with the versions and the git
+commit, so runs of different releases can be compared.
+
+Run from the repository root:
+    python -m benchmarks.bench_scaling --sensors 100 1000 10000 100000
+'''
+def run_case(n, density, backend, duration, seed):
+    start = time.perf_counter()
+    network = synthetic_network(n, density, seed=seed)
+    build_s = time.perf_counter() - start
+
+    lat, lon = network.topology.locations.T
+    epicenter = (float(np.mean(lat)), float(np.mean(lon)))
+    env = make_kernel(backend)
+    sink = NullSink()
+    network.reset(env, log=SimulationLog(sensor_ids=network.topology.ids, sink=sink))
+    start = time.perf_counter()
+    plum.simulate_earthquake(env, epicenter, network.sensors)
+    env.run(duration)
+    network.log.flush()
+    run_s = time.perf_counter() - start
+
+    indptr, _, _ = network.index.adjacency(plum.TRANSMISSION_RANGE_KM)
+    return {
+        'sensors': n,
+        'density_per_km2': density,
+        'mean_degree': indptr[-1] / n,
+        'backend': backend,
+        'build_s': build_s,
+        'run_s': run_s,
+        'events': env.scheduled,
+        'events_per_s': env.scheduled / run_s,
+        'messages_sent': network.messages_sent,
+        'messages_delivered': network.messages_delivered,
+        'log_rows': sink.rows,
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                       / (1024 ** 2 if sys.platform == 'darwin' else 1024),
+    }
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'duration': args.duration,
+        'seed': args.seed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling benchmark on synthetic networks")
+    parser.add_argument('--sensors', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--densities', type=float, nargs='+', default=[0.01, 0.05],
+                        help="sensors per km^2")
+    parser.add_argument('--backend', default='simpy')
+    parser.add_argument('--duration', type=float, default=120)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='./outputs/benchmarks/scaling.json')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'sensors':>9}{'density':>9}{'degree':>8}{'build_s':>9}{'run_s':>9}"
+          f"{'events/s':>11}{'delivered':>11}{'rss_mb':>8}")
+    context = multiprocessing.get_context('spawn')
+    for n in args.sensors:
+        for density in args.densities:
+            with context.Pool(1) as pool:
+                r = pool.apply(run_case, (n, density, args.backend, args.duration, args.seed))
+            results.append(r)
+            print(f"{r['sensors']:>9}{r['density_per_km2']:>9g}{r['mean_degree']:>8.1f}{r['build_s']:>9.2f}"
+                  f"{r['run_s']:>9.2f}{r['events_per_s']:>11.0f}{r['messages_delivered']:>11}"
+                  f"{r['peak_rss_mb']:>8.0f}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'metadata': metadata(args), 'results': results}, f, indent=2)
+    print(f"Results written to {args.output}")
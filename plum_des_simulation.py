@@ -5,14 +5,19 @@ Created on Fri May 23 15:23:48 2025
 @author: 24018273
 """
 
-import simpy
+import logging
 import math
 import random
 import pandas as pd
 import numpy as np
-import csv
-import re
 from pyproj import Proj, Transformer
+from plum_topology import Topology, KnownSensorStore
+from plum_geodesy import epicentral_distances
+from plum_log import SimulationLog, CsvSink, EventKey, time_key
+from plum_kernel import make_kernel
+from plum_loader import read_sensor_table, load_topology
+from plum_state import (SensorState, StateField, FloatField, FlagField, StatusField,
+                        DetectionField, UpdatesField, DETECTION)
 
 
 TRANSMISSION_RANGE_KM: float() = 30 # Based on original PLUM algorithm
@@ -20,14 +25,32 @@ P_WAVE_SPEED_KM_PER_S: float() = 6  # Approximate speed of P-wave in km/s
 S_WAVE_SPEED_KM_PER_S:float() = 3.5  # Approximate speed of S-wave in km/s
 transmission_delay:float = 0.05 # Based on TCP protocol
 waiting_window:float = 5 # Waiting window for confirming an event
-sensor_id_len:int = 3 #lenth of the sensor IDs
 
 false_detection_probability = 0.1 # chance for detecting a noise as earthquake
 miss_probability = 0.2 # chance for missing a detection
 
 
-# Function for calculating the distance between two sensors
-# later on, this should be replaced by proper library
+'''
+Messages of the simulation (detections, timeouts, ...) go to the 'plum'
+logger instead of print(). It is quiet by default (level WARNING) and the
+messages are only formatted when their level is enabled, so a quiet logger
+costs almost nothing in the sensors. set_log_level(logging.DEBUG, handler)
+shows them, and plum_log.SimulationLogHandler keeps them in the log of the run.
+'''
+logger = logging.getLogger('plum')
+logger.addHandler(logging.NullHandler())
+logger.setLevel(logging.WARNING)
+
+
+def set_log_level(level, handler=None):
+    logger.setLevel(level)
+    if handler is not None:
+        logger.addHandler(handler)
+
+
+# Function for calculating the distance between two sensors.
+# The simulation itself uses the vectorised version in plum_geodesy,
+# this one is kept for single lookups and as reference for check_accuracy.
 def calculate_distance(loc1, loc2):
     lat1, lon1 = loc1
     lat2, lon2 = loc2
@@ -42,8 +65,9 @@ def calculate_distance(loc1, loc2):
 # Function for creating random number as peak displacement
 # because at the moment, the simulation doesn't read a ground motion
 # record directly from suitable file.
-def simulate_displacement():
-    return round(random.uniform(0.1, 10.0), 2)  # cm
+# rng is the random.Random of the run, so seeded runs are reproducible.
+def simulate_displacement(rng=random):
+    return round(rng.uniform(0.1, 10.0), 2)  # cm
 
 
 # Defining a class for Messages and it's initial values
@@ -62,72 +86,237 @@ class Message:
 Here we define the network structure. each sensor has it's own known sensors
 which are located with distances of less than TRANSMISSION_RANGE_KM.
 So the sensor can communicate with them.
-Based on the ID of known sensors, we define a dictionary which record the 
-location, P_Value and S_Value of all known sensors for further analysis.
+Based on the ID of known sensors, we define a mapping which record the 
+location, P_Value and S_Value of the known sensors for further analysis.
+The values live in a KnownSensorStore shared by the whole network, and each
+sensor only sees its neighbours through a view of it.
+
+The neighbours of each sensor come from the NeighbourIndex of the Topology,
+which is built once, so a broadcast only touches the sensors in range of the
+sender. The topology never changes between scenarios: reset() only clears the
+state of the sensors and gives the network a new environment, log and rng.
+The state of all the sensors is one SensorState (state), so e.g.
+network.state.alerted_at(t) gives the sensors Alerted at time t.
 
 The transmission delay of the network had been simulated in here as well.
 transmission_delay is applied to all communications. The sender sends the 
 message to all known sensors at once, and all the recipients receive it 
 after transmission_delay.
+With multicast (the default) a broadcast schedules one event per distinct
+delay which delivers the message to the whole group of receivers, instead of
+one SimPy process per receiver (multicast=False, which needs the simpy
+backend: reset raises a ValueError with any other). link_delay can give a delay per link: it is
+called with the distances (km) to the receivers and returns their delays.
+
+Every network keeps its own SimulationLog, where its sensors log their events,
+and its own random generator (rng) for the random values of the run.
+streams (see plum_streams) gives the random values of every sensor from its
+own stream instead, so they do not depend on the order of the events.
+The peak displacements are read from the waveform records of the sensors if
+the network has a waveforms source (see plum_waveforms), and drawn from
+streams or rng if not.
+messages_sent counts the broadcasts of the run and messages_delivered the
+messages received by the sensors.
+
+policy is an optional dissemination policy (see plum_dissemination), which
+decides whether an Alerted sensor broadcasts a new detection again. Without
+one every detection is broadcast. messages_suppressed counts the broadcasts
+it stopped and messages_saved the deliveries they would have made.
+
+pending_arrivals (P-wave arrivals and false triggers not reached yet),
+in_flight (scheduled deliveries) and armed_timers (confirmation timers) count
+what can still change the state of a sensor. When all are 0 the network is
+quiescent() and nothing else can happen in the run, see run_until_quiescent.
 '''
 class Network:
-    def __init__(self, sensors):
+    def __init__(self, sensors, multicast=True, link_delay=None, log=None, rng=random, topology=None,
+                 policy=None, waveforms=None):
         self.sensors = sensors
+        self.rng = rng
+        self.streams = None
+        self.log = log if log is not None else SimulationLog(sensor_ids=[s.id for s in sensors])
+        self.multicast = multicast
+        self.link_delay = link_delay
+        if topology is None:
+            topology = Topology([s.id for s in sensors], [s.location for s in sensors],
+                                cell_km=TRANSMISSION_RANGE_KM)
+        self.topology = topology
+        self.positions = topology.positions
+        self.index = topology.index
+        self.state = SensorState(topology.ids, topology.positions)
+        for sensor in sensors:
+            sensor.state = self.state
+            sensor.index = self.positions[sensor.id]
+        self.known_sensors = None
+        self.policy = policy
+        self.waveforms = waveforms
+        self.messages_sent = 0
+        self.messages_delivered = 0
+        self.messages_suppressed = 0
+        self.messages_saved = 0
+        self.pending_arrivals = 0
+        self.in_flight = 0
+        self.armed_timers = 0
+        # time of the last broadcast and number of messages received of each
+        # sensor, only kept with a policy
+        self.last_broadcast = np.full(len(sensors), np.nan)
+        self.heard = np.zeros(len(sensors), dtype=np.int64)
 
     def initialize_known_sensors(self):
+        indptr, indices, _ = self.index.adjacency(TRANSMISSION_RANGE_KM)
+        self.known_sensors = KnownSensorStore(self.topology.ids, self.topology.locations,
+                                              indptr, indices)
+        for i, sensor in enumerate(self.sensors):
+            sensor.known_sensors = self.known_sensors.view(i)
+
+    # Prepares the network for a new scenario in env, keeping the topology
+    def reset(self, env, rng=random, log=None, streams=None):
+        if not self.multicast and not hasattr(env, 'process'):
+            raise ValueError(f"multicast=False needs the simpy backend, not {type(env).__name__}")
+        self.rng = rng
+        self.streams = streams
+        self.messages_sent = 0
+        self.messages_delivered = 0
+        self.messages_suppressed = 0
+        self.messages_saved = 0
+        self.pending_arrivals = 0
+        self.in_flight = 0
+        self.armed_timers = 0
+        self.last_broadcast.fill(np.nan)
+        self.heard.fill(0)
+        self.log = log if log is not None else SimulationLog(sensor_ids=self.topology.ids)
+        if self.known_sensors is not None:
+            self.known_sensors.reset()
+        self.state.reset()
         for sensor in self.sensors:
-            sensor.known_sensors = {
-                s.id: {
-                    'location': s.location,
-                    'P_Value': None,
-                    'S_Value': None
-                }
-                for s in self.sensors if s.id != sensor.id
-            }
+            sensor.reset(env)
 
 
+    # Sensors within TRANSMISSION_RANGE_KM of the given sensor
+    def neighbours(self, sensor):
+        indices = self.index.neighbours(self.positions[sensor.id], TRANSMISSION_RANGE_KM)
+        return [self.sensors[i] for i in indices]
+
     def broadcast(self, message, sender):
-        for receiver in self.sensors:
-            if receiver.id != sender.id:
-                dist = calculate_distance(receiver.location, sender.location)
-                if dist <= TRANSMISSION_RANGE_KM:
-                    delay = transmission_delay
-                    sender.env.process(self.deliver_with_delay(receiver, message, delay))
-                    
+        self.messages_sent += 1
+        if self.policy is not None:
+            self.last_broadcast[self.positions[sender.id]] = sender.env.now
+        if not self.multicast:
+            for receiver, delay in zip(self.neighbours(sender), self.delays(sender)):
+                self.in_flight += 1
+                sender.env.process(self.deliver_with_delay(receiver, message, float(delay)))
+            return
+        for delay, receivers in self.group_by_delay(sender):
+            self.in_flight += 1
+            sender.env.call_later(delay, self.deliver, receivers, message)
+
+    # Delays of the links from sender to its neighbours
+    def delays(self, sender):
+        i = self.positions[sender.id]
+        if self.link_delay is None:
+            return np.full(len(self.index.neighbours(i, TRANSMISSION_RANGE_KM)), transmission_delay)
+        return np.asarray(self.link_delay(self.index.neighbour_distances(i, TRANSMISSION_RANGE_KM)), dtype=float)
+
+    # Receivers (positions) of sender grouped by link delay, in order of delay
+    def group_by_delay(self, sender):
+        indices = self.index.neighbours(self.positions[sender.id], TRANSMISSION_RANGE_KM)
+        if self.link_delay is None:
+            if len(indices):
+                yield transmission_delay, indices
+            return
+        delays = self.delays(sender)
+        for delay in np.unique(delays):
+            yield float(delay), indices[delays == delay]
+
+    # Asks the policy if sender (Alerted) may broadcast a new detection
+    def allow_rebroadcast(self, sender):
+        if self.policy is None or self.policy.allow(self, sender, sender.env.now):
+            return True
+        self.messages_suppressed += 1
+        self.messages_saved += len(self.index.neighbours(self.positions[sender.id], TRANSMISSION_RANGE_KM))
+        return False
+
+    # EventKey of an event confirmed by two (sensor_id, time) detections
+    def event_key(self, first, second):
+        return EventKey(self.positions[first[0]], time_key(first[1]),
+                        self.positions[second[0]], time_key(second[1]))
+
+    # Peak displacement of a new detection of sensor
+    def draw_peak(self, sensor):
+        if self.waveforms is not None:
+            return self.waveforms.peak(sensor.id, sensor.env.now)
+        if self.streams is not None:
+            return self.streams.peak(sensor.index)
+        return simulate_displacement(self.rng)
+
+    # Nothing left which can change the state of a sensor
+    def quiescent(self):
+        return self.pending_arrivals == 0 and self.in_flight == 0 and self.armed_timers == 0
+
+    # Delivers message to the sensors at positions recipients. Only sensors
+    # in Observation or Detection react to a message, so the others are
+    # skipped with one look at the status array.
+    def deliver(self, recipients, message):
+        self.in_flight -= 1
+        self.messages_delivered += len(recipients)
+        if self.policy is not None:
+            self.heard[recipients] += 1
+        sensors = self.sensors
+        for i in recipients[self.state.status[recipients] <= DETECTION].tolist():
+            sensors[i].receive(message)
+
     def deliver_with_delay(self, recipient, message, delay):
         yield recipient.env.timeout(delay)
+        self.in_flight -= 1
+        self.messages_delivered += 1
+        if self.policy is not None:
+            self.heard[self.positions[recipient.id]] += 1
         recipient.receive(message)                                               
         
         
-# Defining a class for Sensors withing the network
+'''
+Defining a class for Sensors withing the network
+The state of a sensor in a run (status, detections, peaks, flags, ...) lives
+in the SensorState of its network (see plum_state), the sensor is a view of
+its row (state, index), which the Network sets. The fields below read and
+write that row like plain attributes.
+'''
 class Sensor:
+    __slots__ = ('id', 'location', 'network', 'known_sensors', 'env', 'timer', 'state', 'index')
+
+    status = StatusField()
+    first_detection = DetectionField()
+    second_detection = DetectionField()
+    third_detection = DetectionField()
+    fourth_detection = DetectionField()
+    p_detection = FloatField()
+    s_detection = FloatField()
+    received_detection = FlagField()
+    received_confirmed = FlagField()
+    received_updates = UpdatesField()
+    event_id = StateField()
+    peak_displacement = FloatField()
+    previous_update_timestamp = FloatField()
+    P_peak = FloatField()
+    S_peak = FloatField()
+    p_update = FlagField()
+    s_update = FlagField()
+    event_location = StateField()
+    event_origin = StateField()
+
     def __init__(self, env, sensor_id, location, network):
-        self.env = env
         self.id = sensor_id
         self.location = location
         self.network = network
-        self.status = 'Observation'
-        self.first_detection = None
-        self.second_detection = None
-        self.third_detection = None
-        self.fourth_detection = None
-        self.p_detection = None
-        self.s_detection = None
-        self.received_detection = False
-        self.received_confirmed = False
-        self.received_updates = []
-        self.event_id = None
-        self.peak_displacement = None #######
         self.known_sensors = {}
-        self.previous_update_timestamp = None
-        
-        self.P_peak = None
-        self.S_peak = None
-        self.p_update = False
-        self.s_update = False
-        
-        self.event_location = None
-        self.event_origin = None
+        self.state = None
+        self.index = None
+        self.reset(env)
+
+    # The sensor for a new run, its row of the state is reset by the Network
+    def reset(self, env):
+        self.env = env
+        self.timer = None # confirmation timer, while in Detection
         
         
     # The function for P phase detection. It might happen while the sensors
@@ -136,38 +325,39 @@ class Sensor:
         # msg = Message("Detection", self.id, timestamp, event_id='NaN', content = self.P_peak)
         # self.network.broadcast(msg, self)
         
-        # log_event(self.env.now, self.id, self.status, 'Produce', 'P_Wave_Detection', 'NaN', 'WaitForConfirmation', self.P_peak)
+        # self.network.log.log_event(self.env.now, self.id, self.status, 'Produce', 'P_Wave_Detection', 'NaN', 'WaitForConfirmation', self.P_peak)
         
         if self.status == 'Observation':
-            print(f"{timestamp:.3f}s - Sensor {self.id} DETECTED earthquake (P-wave).")
+            if logger.isEnabledFor(logging.DEBUG):
+                self.trace(logging.DEBUG, "%.3fs - Sensor %s DETECTED earthquake (P-wave).", timestamp, self.id)
             self.status = 'Detection'
             self.first_detection = (self.id, timestamp)
-            self.P_peak= simulate_displacement()
+            self.P_peak= self.network.draw_peak(self)
             msg = Message("Detection", self.id, timestamp, event_id='NaN', content = self.P_peak)
             self.network.broadcast(msg, self)
             
-            log_event(self.env.now, self.id, self.status, 'Produce', 'P_Wave_Detection', 'NaN', 'WaitForConfirmation', self.P_peak)
+            self.network.log.log_event(self.env.now, self.id, self.status, 'Produce', 'P_Wave_Detection', 'NaN', 'WaitForConfirmation', self.P_peak)
             self.start_detection_timer()
             
         
         elif self.status == 'Detection':
-            print(f"{timestamp:.3f}s - Sensor {self.id} DETECTED earthquake (P-wave).")
+            if logger.isEnabledFor(logging.DEBUG):
+                self.trace(logging.DEBUG, "%.3fs - Sensor %s DETECTED earthquake (P-wave).", timestamp, self.id)
             self.status = 'Alerted'
             self.second_detection = (self.id, timestamp)
             self.received_confirmed = True
-            s1_id, t1 = self.first_detection
-            s2_id, t2 = (self.id, timestamp)
-            event_id = f"{s1_id}{self.format_time(t1)}{s2_id}{self.format_time(t2)}"
+            self.stop_detection_timer()
+            event_id = self.network.event_key(self.first_detection, self.second_detection)
 
             self.event_id = event_id
             msg = Message("Detection", self.id, timestamp, event_id='NaN', content = self.P_peak)
             self.network.broadcast(msg, self)
-            log_event(self.env.now, self.id, self.status, 'Produce', 'P_Wave_Detection', 'NaN', 'StatusToAlerted', self.P_peak)
+            self.network.log.log_event(self.env.now, self.id, self.status, 'Produce', 'P_Wave_Detection', 'NaN', 'StatusToAlerted', self.P_peak)
            
             
             # msg = Message("Confirmed", self.id, timestamp, event_id=event_id)
             self.p_detection = timestamp
-            log_event(self.env.now, self.id, self.status, 'ChangeStatus', 'ConfirmedAlert', 'NaN', 'StatusToAlerted', 'NaN')
+            self.network.log.log_event(self.env.now, self.id, self.status, 'ChangeStatus', 'ConfirmedAlert', 'NaN', 'StatusToAlerted', 'NaN', event_id)
             
             
             
@@ -176,58 +366,80 @@ class Sensor:
             # self.status = 'Decision'
             # msg = Message('Update', self.id, timestamp, event_id=event_id, content = self.P_peak)
             # print(f"{timestamp:.3f}s - Sensor {self.id} PRODUCED an Update (P-wave).")
-            # log_event(self.env.now, self.id, self.status, 'Produce', 'P_Wave_Update', 'NaN', 'NaN', self.P_peak)
+            # self.network.log.log_event(self.env.now, self.id, self.status, 'Produce', 'P_Wave_Update', 'NaN', 'NaN', self.P_peak)
             # self.network.broadcast(msg, self)
             # self.p_update = True
         
         elif self.status == 'Alerted':
-            print(f"{timestamp:.3f}s - Sensor {self.id} DETECTED earthquake (P-wave).")
+            if logger.isEnabledFor(logging.DEBUG):
+                self.trace(logging.DEBUG, "%.3fs - Sensor %s DETECTED earthquake (P-wave).", timestamp, self.id)
+            if not self.network.allow_rebroadcast(self):
+                self.network.log.log_event(self.env.now, self.id, self.status, 'Suppress', 'P_Wave_Detection', 'NaN', 'NaN', self.P_peak)
+                return
             msg = Message("Detection", self.id, timestamp, event_id='NaN', content = self.P_peak)
             self.network.broadcast(msg, self)
             
-            log_event(self.env.now, self.id, self.status, 'Produce', 'P_Wave_Detection', 'NaN', 'WaitForConfirmation', self.P_peak)
+            self.network.log.log_event(self.env.now, self.id, self.status, 'Produce', 'P_Wave_Detection', 'NaN', 'WaitForConfirmation', self.P_peak)
         # else:
         #     print(f"{timestamp:.3f}s - Sensor {self.id} received P-wave but cannot produce Detection message (Status: {self.status})")
-            # log_event(self.env.now, self.id, self.status, 'Error1', 'NaN', 'NaN', 'NaN', 'NaN')
+            # self.network.log.log_event(self.env.now, self.id, self.status, 'Error1', 'NaN', 'NaN', 'NaN', 'NaN')
             
         
+    # Writes a message of the sensor to the logger, with the simulation time,
+    # the sensor ID and the log of the run as extra fields of the record.
+    # Callers check logger.isEnabledFor(level) first.
+    def trace(self, level, msg, *args):
+        logger.log(level, msg, *args, extra={'sim_time': self.env.now, 'sensor_id': self.id,
+                                             'simulation_log': self.network.log})
+
     def start_detection_timer(self):
-        self.env.process(self.wait_for_confirmation())
+        self.network.armed_timers += 1
+        self.timer = self.env.call_later(waiting_window, self.wait_for_confirmation)
 
+    # The event is confirmed, the timer is removed from the schedule
+    def stop_detection_timer(self):
+        if self.timer is not None:
+            self.network.armed_timers -= 1
+            self.env.cancel(self.timer)
+            self.timer = None
 
+
+    # Called at the end of the waiting window
     def wait_for_confirmation(self):
-        yield self.env.timeout(waiting_window)
+        self.network.armed_timers -= 1
+        self.timer = None
         if self.status == 'Detection' and not self.received_confirmed:
             self.first_detection = None
             self.status = 'Observation'
-            print(f"{self.env.now:.3f}s - Sensor {self.id} timed out waiting for confirmation.")
-            log_event(self.env.now, self.id, self.status, 'EventCancelation', 'NaN', 'NaN', 'BackToObservation', 'NaN')
+            if logger.isEnabledFor(logging.DEBUG):
+                self.trace(logging.DEBUG, "%.3fs - Sensor %s timed out waiting for confirmation.", self.env.now, self.id)
+            self.network.log.log_event(self.env.now, self.id, self.status, 'EventCancelation', 'NaN', 'NaN', 'BackToObservation', 'NaN')
             
     
     def receive(self, msg):
+        status = self.status
         # the first two If can be merged
-        if msg.type == "Detection" and self.status == "Observation":
+        if msg.type == "Detection" and status == "Observation":
             self.status = 'Detection'
             self.first_detection = (msg.sender, msg.time)
             self.start_detection_timer()
-            log_event(self.env.now, self.id, self.status, 'Receive', 'P_Wave_Detection', msg.sender, 'WaitForConfirmation', 'NaN')
-            # log_event(self.env.now, self.id, "ReceivedDetection", f"From{msg.sender}")
+            self.network.log.log_event(self.env.now, self.id, self.status, 'Receive', 'P_Wave_Detection', msg.sender, 'WaitForConfirmation', 'NaN')
+            # self.network.log.log_event(self.env.now, self.id, "ReceivedDetection", f"From{msg.sender}")
             
-        elif msg.type == "Detection" and self.status == 'Detection':
-            log_event(self.env.now, self.id, self.status, 'Receive', 'P_Wave_Detection', msg.sender, 'StatusToAlerted', 'NaN')
-            # log_event(self.env.now, self.id, "ReceivedDetection", f"From{msg.sender}")
+        elif msg.type == "Detection" and status == 'Detection':
+            self.network.log.log_event(self.env.now, self.id, self.status, 'Receive', 'P_Wave_Detection', msg.sender, 'StatusToAlerted', 'NaN')
+            # self.network.log.log_event(self.env.now, self.id, "ReceivedDetection", f"From{msg.sender}")
             self.received_confirmed = True
+            self.stop_detection_timer()
             self.second_detection = (msg.sender, msg.time)
-            s1_id, t1 = self.first_detection
-            s2_id, t2 = (msg.sender, msg.time)
-            event_id = f"{s1_id}{self.format_time(t1)}{s2_id}{self.format_time(t2)}"
+            event_id = self.network.event_key(self.first_detection, self.second_detection)
             # print('2', event_id)
             self.event_id = event_id
             # msg = Message("Confirmed", self.id, self.env.now, event_id=event_id)
             self.status = 'Alerted'
-            log_event(self.env.now, self.id, self.status, 'ChangeStatus', 'ConfirmedAlert', msg.sender, 'StatusToAlerted', 'NaN')
-            # log_event(self.env.now, self.id, self.status, 'Produce', 'ConfirmedAlert', 'NaN', 'StatusToAlerted', 'NaN')
-            # log_event(self.env.now, self.id, "ProducedConfirmationMessage", "StatusToAlerted")
+            self.network.log.log_event(self.env.now, self.id, self.status, 'ChangeStatus', 'ConfirmedAlert', msg.sender, 'StatusToAlerted', 'NaN', event_id)
+            # self.network.log.log_event(self.env.now, self.id, self.status, 'Produce', 'ConfirmedAlert', 'NaN', 'StatusToAlerted', 'NaN')
+            # self.network.log.log_event(self.env.now, self.id, "ProducedConfirmationMessage", "StatusToAlerted")
             #self.p_detection = (self.id, timestamp)
             # self.network.broadcast(msg, self)
             # print(f"{self.env.now:.3f}s - Sensor {self.id} produced a Confirmed message.")
@@ -242,21 +454,19 @@ class Sensor:
         #         '''
         #         When a sensors receives a Confirmed message for the first time,
         #         it should update the first_detection and second_detection
-        #         variables. as follow:
+        #         variables. as follow (msg.event_id is an EventKey, so
+        #         nothing has to be parsed):
         #         '''
+        #         ids = self.network.topology.ids
                 
         #         if self.first_detection == None:
-        #             pattern = r"(?P<s1>[a-zA-Z0-9]{3})(?P<t1_h>\d{2})(?P<t1_m>\d{2})(?P<t1_s>\d{2}\.\d{3})(?P<s2>[a-zA-Z0-9]{3})(?P<t2_h>\d{2})(?P<t2_m>\d{2})(?P<t2_s>\d{2}\.\d{3})"
-        #             matched = re.fullmatch(pattern, msg.event_id)
-        #             t1_timestamp = int(matched.group('t1_h')) * 3600 + int(matched.group('t1_m')) * 60 + float(matched.group('t1_s'))
-        #             self.first_detection = (matched.group('s1'), t1_timestamp)
+        #             key = msg.event_id
+        #             self.first_detection = (ids[key.first_sensor], key.first_time / 1000)
         #             # print('First_Detection Updated!')
                     
         #         elif self.second_detection == None:
-        #             pattern = r"(?P<s1>[a-zA-Z0-9]{3})(?P<t1_h>\d{2})(?P<t1_m>\d{2})(?P<t1_s>\d{2}\.\d{3})(?P<s2>[a-zA-Z0-9]{3})(?P<t2_h>\d{2})(?P<t2_m>\d{2})(?P<t2_s>\d{2}\.\d{3})"
-        #             matched = re.fullmatch(pattern, msg.event_id)
-        #             t2_timestamp = int(matched.group('t2_h')) * 3600 + int(matched.group('t2_m')) * 60 + float(matched.group('t2_s'))
-        #             self.second_detection = (matched.group('s2'), t2_timestamp)
+        #             key = msg.event_id
+        #             self.second_detection = (ids[key.second_sensor], key.second_time / 1000)
         #             # print('Second_Detection Updated!')
                     
         #         '''
@@ -265,89 +475,162 @@ class Sensor:
         #         All done on 2025-04-22
         #         '''
         #         print(f"{self.env.now:.3f}s - Sensor {self.id} is now ALERTED by Confirmed message.")
-        #         log_event(self.env.now, self.id, self.status, 'Receive', 'ConfirmedAlert', msg.sender, 'StatusToAlerted', 'NaN')
+        #         self.network.log.log_event(self.env.now, self.id, self.status, 'Receive', 'ConfirmedAlert', msg.sender, 'StatusToAlerted', 'NaN')
                 
-        #         # log_event(self.env.now, self.id, self.status, 'Rebroadcast', 'ConfirmedAlert', 'NaN', 'NaN', 'NaN')
+        #         # self.network.log.log_event(self.env.now, self.id, self.status, 'Rebroadcast', 'ConfirmedAlert', 'NaN', 'NaN', 'NaN')
         #         # msg = Message("Confirmed", self.id, self.env.now, event_id=self.event_id)
         #         # self.network.broadcast(msg, self)
                 
             # else:
             #     # print(f"{self.env.now:.3f}s - Sensor {self.id} is already ALERTED by Confirmed message. (Ignore)")
-            #     log_event(self.env.now, self.id, self.status, 'Receive', 'ConfirmedAlert', msg.sender, 'Ignore', 'NaN')
+            #     self.network.log.log_event(self.env.now, self.id, self.status, 'Receive', 'ConfirmedAlert', msg.sender, 'Ignore', 'NaN')
                 
-    def format_time(self, t):
-        h, rem = divmod(float(t), 3600)
-        m, s = divmod(rem, 60)
-        
-        return f"{h:02.0f}{m:02.0f}{s:06.3f}"
-    
-def simulate_earthquake(env, epicenter, sensors):
-    print(f"{env.now:.3f}s - Earthquake Simulation Started.")
-    distances = [(sensor, calculate_distance(sensor.location, epicenter)) for sensor in sensors]
-    for sensor, dist in distances:
+'''
+Schedules the arrival of the P-wave at every sensor. env is a kernel from
+plum_kernel (SimPy or heap backend).
+missed (one boolean per sensor) marks the sensors which miss the P-wave, and
+false_triggers gives the time of a false detection (noise) for each sensor,
+NaN for none. Both are used by the Monte Carlo mode (see plum_montecarlo).
+'''
+def simulate_earthquake(env, epicenter, sensors, missed=None, false_triggers=None):
+    logger.info("%.3fs - Earthquake Simulation Started.", env.now)
+    lat, lon = zip(*(sensor.location for sensor in sensors))
+    distances = epicentral_distances(lat, lon, epicenter)
+    for i, (sensor, dist) in enumerate(zip(sensors, distances)):
         p_delay = dist / P_WAVE_SPEED_KM_PER_S
         s_delay = dist / S_WAVE_SPEED_KM_PER_S
-        env.process(trigger_p_wave(env, sensor, p_delay))
-        # env.process(trigger_s_wave(env, sensor, s_delay))
+        if missed is None or not missed[i]:
+            sensor.network.pending_arrivals += 1
+            env.call_later(p_delay, trigger_p_wave, env, sensor)
+        if false_triggers is not None and not np.isnan(false_triggers[i]):
+            sensor.network.pending_arrivals += 1
+            env.call_later(false_triggers[i], trigger_p_wave, env, sensor)
+        # env.call_later(s_delay, trigger_s_wave, env, sensor)
 
-def trigger_p_wave(env, sensor, delay):
-    yield env.timeout(delay)
+# Schedules detections of the sensors at picked times instead (see plum_trigger)
+def schedule_picks(env, sensors, picks):
+    positions, times = picks
+    for position, t in zip(np.asarray(positions).tolist(), np.asarray(times).tolist()):
+        sensor = sensors[position]
+        sensor.network.pending_arrivals += 1
+        env.call_later(t, trigger_p_wave, env, sensor)
+
+# Called when the P-wave reaches the sensor
+def trigger_p_wave(env, sensor):
+    sensor.network.pending_arrivals -= 1
     sensor.detect_p_wave(env.now)
+
+
+'''
+Runs env until duration, but stops as soon as the network is quiescent (no
+arrival, message or timer left, see Network). Returns the stop reason,
+'quiescent' or 'horizon' (duration was reached first), and the stop time,
+which is the time of the last event that could change a sensor for
+'quiescent'. Events after that, e.g. the samples of the instrumentation, are
+not run. Like env.run, events at duration are not run.
+'''
+def run_until_quiescent(env, network, duration):
+    while not network.quiescent():
+        if env.peek() >= duration:
+            if env.now < duration:
+                env.run(duration)
+            return 'horizon', env.now
+        env.step()
+    return 'quiescent', env.now
     
 '''
 In here we load the data regarding to each senor
+The file (CSV or Parquet) is read and checked by plum_loader in one pass.
 '''
 def load_sensors_from_csv(env, filename):
-    sensors = []
-    sensor_file = pd.read_csv(filename)
-    for row in range(len(sensor_file)):
-        sensor_id = sensor_file.id[row]
-        lat = sensor_file.latitude[row]
-        lon = sensor_file.longitude[row]
-        sensors.append(Sensor(env, sensor_id, (lat, lon), None))
-    return sensors
+    ids, lat, lon = read_sensor_table(filename)
+    return sensors_from_arrays(env, ids.tolist(), lat.tolist(), lon.tolist())
+
+
+def sensors_from_arrays(env, ids, lat, lon):
+    return [Sensor(env, sensor_id, location, None) for sensor_id, location in zip(ids, zip(lat, lon))]
 
 
 '''
-The log file of the simulation. All events are recorded here.
+Builds the network of the sensors in sensors_file. This is done once, the
+same network is reset and reused by every scenario.
+With cache=True the parsed sensor file is cached for the next runs (see
+plum_loader).
 '''
-def log_event(time, sensor_id, sensor_status, action, event_type, sender_id, reaction, value):
-    simulation_log.append({
-        'time': round(time, 4),
-        'sensor_id': sensor_id,
-        'status':sensor_status,
-        'action': action,
-        'event': event_type,
-        'sender_id': sender_id,
-        'reaction': reaction,
-        'value': value
-    })
-
-def save_log_to_csv(filename='./outputs/simulation_log.csv'):
-    keys = ['time', 'sensor_id','status', 'action', 'event', 'sender_id', 'reaction', 'value']
-    with open(filename, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=keys)
-        writer.writeheader()
-        writer.writerows(simulation_log)
-        
+def build_network(sensors_file='./data/sensors.csv', cache=False, **kwargs):
+    topology = load_topology(sensors_file, cell_km=TRANSMISSION_RANGE_KM, cache=cache)
+    sensor_list = sensors_from_arrays(None, topology.ids, *topology.locations.T.tolist())
+    return connect_network(sensor_list, topology=topology, **kwargs)
+
+
+# Builds the network of a list of sensors
+def connect_network(sensor_list, **kwargs):
+    network = Network(sensor_list, **kwargs)
+    for sensor in sensor_list:
+        sensor.network = network
+    network.initialize_known_sensors()
+    return network
+
+
+'''
+Runs one earthquake scenario on network and returns its log with the eq_id
+column. rng is the random generator of the scenario, e.g. random.Random(seed),
+and backend the simulation kernel ('simpy' or 'heap', see plum_kernel).
+The run stops early once the network is quiescent (see run_until_quiescent),
+which gives the same log as running to duration. stop_reason and stop_time
+are kept with eq_id in the metadata of the log (the attrs of the DataFrame).
+With a sink (see plum_log) the log is written to the sink in chunks while the
+scenario runs, the metadata is given to the sink (write_metadata) and
+returned instead of the log.
+instrumentation (see plum_instrumentation) is attached to the run if given.
+picks, (sensor positions, times) e.g. from plum_trigger, gives the times of
+the detections instead of the P-wave arrivals at epicenter.
+streams (see plum_streams) gives the random values of the scenario instead
+of rng. missed and false_triggers add misses and false triggers to the
+arrivals, as in simulate_earthquake.
+For running many scenarios (in parallel) see plum_runner.run_scenarios.
+'''
+def run_scenario(eq_id, epicenter, network, duration=120, rng=random, backend='simpy', sink=None,
+                 instrumentation=None, picks=None, streams=None, missed=None, false_triggers=None):
+    env = make_kernel(backend)
+    network.reset(env, rng, log=SimulationLog(sensor_ids=network.topology.ids, sink=sink, eq_id=eq_id),
+                  streams=streams)
+
+    def start():
+        if picks is None:
+            simulate_earthquake(env, epicenter, network.sensors, missed, false_triggers)
+        else:
+            schedule_picks(env, network.sensors, picks)
+
+    if instrumentation is None:
+        start()
+        stop_reason, stop_time = run_until_quiescent(env, network, duration)
+    else:
+        # the Sensor methods are wrapped on the class, they are restored
+        # whatever happens in the run
+        try:
+            instrumentation.attach(network, env)
+            with instrumentation.timed('simulate_earthquake'):
+                start()
+            with instrumentation.timed('run'):
+                stop_reason, stop_time = run_until_quiescent(env, network, duration)
+        finally:
+            instrumentation.detach()
+    network.log.metadata.update(eq_id=eq_id, stop_reason=stop_reason, stop_time=float(stop_time))
+    if sink is not None:
+        network.log.flush()
+        sink.write_metadata(network.log.metadata)
+        return dict(network.log.metadata)
+    return network.log.to_dataframe()
+
+
 if __name__ == "__main__":
-    # simulation_log = []
-    log_file = pd.DataFrame()
-    randomness_log_file = pd.DataFrame()
     earthquake_df = pd.read_csv('./data/earthquake.csv')
     simulation_duration = 120
+    network = build_network('./data/sensors.csv')
     # Without Randomness in P-phase Detection
-    for _, earthquake in earthquake_df.iterrows():
-        env = simpy.Environment()
-        sensor_list = load_sensors_from_csv(env, './data/sensors.csv')
-        network = Network(sensor_list)
-        for sensor in sensor_list:
-            sensor.network = network
-        network.initialize_known_sensors()
-        simulation_log = []
-        simulate_earthquake(env, (earthquake.latitude, earthquake.longitude), sensor_list)
-        env.run(simulation_duration)
-        log = pd.DataFrame.from_dict(simulation_log)
-        log['eq_id'] = earthquake.id
-        log_file = pd.concat([log_file, log])
-    log_file.to_csv('./outputs/log_file.csv')
+    # Every scenario is written to the log file as soon as it finishes
+    with CsvSink('./outputs/log_file.csv') as log_file:
+        for _, earthquake in earthquake_df.iterrows():
+            run_scenario(earthquake.id, (earthquake.latitude, earthquake.longitude),
+                         network, simulation_duration, sink=log_file)
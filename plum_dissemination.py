@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:36:16 2026
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+
+import plum_des_simulation as plum
+from plum_kernel import BACKENDS
+from plum_streams import realisation_streams
+
+
+'''
+Dissemination policies against message storms.
+Once a sensor is Alerted, every new detection of it is broadcast to all its
+neighbours again, which adds N * degree messages in dense networks while the
+receivers are mostly Alerted already. A policy, given to the Network
+(network.policy = policy), decides for each of these rebroadcasts whether it
+is sent: allow(network, sensor, now) returns False to suppress it. The first
+detection of a sensor and the detection which confirms an event are always
+broadcast. A suppressed rebroadcast can still be the one a neighbour in
+Detection needed to confirm its event before its waiting window ran out, so
+a policy can slow an alert down and also leave some sensors unalerted (see
+the coverage_loss of compare_policies).
+
+- SuppressDuplicates: an Alerted sensor only broadcasts if it has not
+  broadcast anything in the run yet.
+- RateLimit(min_interval): at most one broadcast per sensor every
+  min_interval seconds.
+- Gossip(probability): the rebroadcast is sent with probability, drawn from
+  the stream of the sensor (see plum_streams), or the rng of the network.
+- CounterBased(threshold): the rebroadcast is suppressed once the sensor has
+  received threshold messages, its neighbourhood knows about the event.
+'''
+class SuppressDuplicates:
+    name = 'suppress'
+
+    def allow(self, network, sensor, now):
+        return np.isnan(network.last_broadcast[network.positions[sensor.id]])
+
+
+class RateLimit:
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self.name = f"rate:{min_interval:g}"
+
+    def allow(self, network, sensor, now):
+        last = network.last_broadcast[network.positions[sensor.id]]
+        return np.isnan(last) or now - last >= self.min_interval
+
+
+class Gossip:
+    def __init__(self, probability):
+        self.probability = probability
+        self.name = f"gossip:{probability:g}"
+
+    def allow(self, network, sensor, now):
+        if network.streams is not None:
+            return network.streams.random(network.positions[sensor.id]) < self.probability
+        return network.rng.random() < self.probability
+
+
+class CounterBased:
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.name = f"counter:{threshold:g}"
+
+    def allow(self, network, sensor, now):
+        return network.heard[network.positions[sensor.id]] < self.threshold
+
+
+# Policy from its name, e.g. 'flood' (None), 'suppress', 'rate:2', 'gossip:0.5', 'counter:3'
+def make_policy(spec):
+    kind, _, value = spec.partition(':')
+    if kind == 'flood':
+        return None
+    if kind == 'suppress':
+        return SuppressDuplicates()
+    policies = {'rate': RateLimit, 'gossip': Gossip, 'counter': CounterBased}
+    if kind not in policies or not value:
+        raise ValueError(f"Unknown policy {spec!r}, expected flood, suppress, rate:<s>, "
+                         "gossip:<p> or counter:<n>")
+    return policies[kind](float(value))
+
+
+'''
+Runs the catalogue with every policy (None is flooding) on the same network
+and returns one row per policy and earthquake.
+Without noise every sensor detects once and an Alerted sensor only
+rebroadcasts the P-wave it detects after being alerted by its neighbours, so
+suppress and rate never have anything to stop. Each earthquake is therefore
+run realisations times with the misses and false triggers of the Monte Carlo
+mode (miss_probability, false_detection_probability, drawn from the streams
+of realisation r, see plum_streams), the same for every policy.
+The row has the means over the realisations of the message counts (sent,
+delivered, suppressed and saved deliveries) and of the alerts (n_alerted,
+first_alert and mean_alert, the mean time at which the sensors were
+alerted), and the difference with flooding: saved_fraction (of the
+deliveries), the extra first_alert_delay and mean_alert_delay, and
+coverage_loss, the mean number of sensors flooding alerts and the policy
+does not (flood n_alerted - n_alerted).
+'''
+def compare_policies(network, earthquakes, policies, seed=0, duration=120, backend='simpy',
+                     realisations=20, miss_probability=None, false_detection_probability=None):
+    if miss_probability is None:
+        miss_probability = plum.miss_probability
+    if false_detection_probability is None:
+        false_detection_probability = plum.false_detection_probability
+    policies = [None, *[policy for policy in policies if policy is not None]]
+    previous = network.policy
+    rows = []
+    try:
+        for policy in policies:
+            network.policy = policy
+            for _, earthquake in earthquakes.iterrows():
+                runs = []
+                for r in range(realisations):
+                    streams = realisation_streams(seed, r, len(network.sensors))
+                    missed, false_triggers = streams.noise(miss_probability, false_detection_probability,
+                                                           duration)
+                    log = plum.run_scenario(earthquake.id, (earthquake.latitude, earthquake.longitude),
+                                            network, duration, backend=backend, streams=streams,
+                                            missed=missed, false_triggers=false_triggers)
+                    alerts = log[log.action == 'ChangeStatus'].groupby('sensor_id', observed=True).time.min()
+                    runs.append({'messages_sent': network.messages_sent,
+                                 'messages_delivered': network.messages_delivered,
+                                 'messages_suppressed': network.messages_suppressed,
+                                 'messages_saved': network.messages_saved,
+                                 'n_alerted': len(alerts),
+                                 'first_alert': alerts.min() if len(alerts) else np.nan,
+                                 'mean_alert': alerts.mean() if len(alerts) else np.nan})
+                rows.append({'policy': 'flood' if policy is None else policy.name,
+                             'eq_id': earthquake.id, **pd.DataFrame(runs).mean().to_dict()})
+    finally:
+        network.policy = previous
+
+    results = pd.DataFrame(rows)
+    flood = results[results.policy == 'flood'].set_index('eq_id')
+    reference = flood.loc[results.eq_id]
+    results['saved_fraction'] = 1 - results.messages_delivered.to_numpy() / reference.messages_delivered.to_numpy()
+    results['first_alert_delay'] = results.first_alert.to_numpy() - reference.first_alert.to_numpy()
+    results['mean_alert_delay'] = results.mean_alert.to_numpy() - reference.mean_alert.to_numpy()
+    results['coverage_loss'] = reference.n_alerted.to_numpy() - results.n_alerted.to_numpy()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare dissemination policies with flooding")
+    parser.add_argument('policies', nargs='*', default=['suppress', 'rate:2', 'gossip:0.5', 'counter:3'],
+                        help="flood, suppress, rate:<s>, gossip:<p> or counter:<n>")
+    parser.add_argument('--earthquakes', default='./data/earthquake.csv')
+    parser.add_argument('--sensors', default='./data/sensors.csv')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--duration', type=float, default=120)
+    parser.add_argument('--backend', default='simpy', choices=sorted(BACKENDS))
+    parser.add_argument('--realisations', type=int, default=20)
+    args = parser.parse_args()
+
+    network = plum.build_network(args.sensors)
+    results = compare_policies(network, pd.read_csv(args.earthquakes),
+                               [make_policy(spec) for spec in args.policies],
+                               args.seed, args.duration, args.backend, args.realisations)
+    print(results.to_string(index=False))
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:19:59 2026
+"""
+
+import numpy as np
+
+
+EARTH_RADIUS_KM: float = 6371 # Same radius as calculate_distance
+
+
+'''
+Vectorised haversine distances. These replace the scalar calculate_distance
+in the simulation: the sensor to epicentre distances are computed as one
+vector per scenario, and the sensor to sensor distances are computed once per
+topology (see NeighbourIndex) and stored next to the adjacency.
+The formula is the same as calculate_distance, so both give the same values
+up to floating point rounding (see check_accuracy).
+'''
+def haversine_km(lat1, lon1, lat2, lon2):
+    dlat = np.radians(lat2 - lat1)
+    dlon = np.radians(lon2 - lon1)
+    a = np.sin(dlat / 2) ** 2 + np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+# Distance of every sensor to the epicentre, epicenter is (lat, lon)
+def epicentral_distances(lat, lon, epicenter):
+    return haversine_km(np.asarray(lat, dtype=float), np.asarray(lon, dtype=float),
+                        epicenter[0], epicenter[1])
+
+
+'''
+Accuracy check of the vectorised distances against calculate_distance on
+random pairs of points. Pairs are drawn around New Zealand (where the
+bundled sensors are) and over the whole globe. Returns the largest absolute
+difference in km.
+'''
+def check_accuracy(n_pairs=100000, seed=0, tolerance_km=1e-9):
+    from plum_des_simulation import calculate_distance
+
+    rng = np.random.default_rng(seed)
+    half = n_pairs // 2
+    lat1 = np.concatenate((rng.uniform(-48, -34, half), rng.uniform(-90, 90, n_pairs - half)))
+    lon1 = np.concatenate((rng.uniform(165, 179, half), rng.uniform(-180, 180, n_pairs - half)))
+    lat2 = np.concatenate((lat1[:half] + rng.uniform(-0.5, 0.5, half), rng.uniform(-90, 90, n_pairs - half)))
+    lon2 = np.concatenate((lon1[:half] + rng.uniform(-0.5, 0.5, half), rng.uniform(-180, 180, n_pairs - half)))
+
+    vectorised = haversine_km(lat1, lon1, lat2, lon2)
+    scalar = np.array([calculate_distance((a, b), (c, d))
+                       for a, b, c, d in zip(lat1, lon1, lat2, lon2)])
+    error = float(np.max(np.abs(vectorised - scalar)))
+    if error > tolerance_km:
+        raise AssertionError(f"Vectorised distances differ from calculate_distance by {error} km")
+    return error
+
+
+if __name__ == "__main__":
+    print(f"Largest difference to calculate_distance: {check_accuracy():.3e} km")
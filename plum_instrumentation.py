@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:29:19 2026
+"""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+import pandas as pd
+
+
+'''
+Optional instrumentation of a simulation run.
+attach() wraps the hot paths of one network and its kernel with counters and
+timers: Network.broadcast, Network.deliver (multicast delivery),
+Network.deliver_with_delay (unicast delivery, only counted as it is a
+generator), Sensor.receive, Sensor.detect_p_wave, SimulationLog.log_event, and
+the scheduling (call_later) and cancelling of timers. The wrappers are
+instance attributes, except for the Sensor methods: sensors have __slots__,
+so those are wrapped on the class while attached. detach() restores
+everything, so a run without instrumentation does not pay anything for it.
+
+While attached, the queue length of the kernel and the message counts are
+sampled every sample_interval simulated seconds. Times are inclusive, e.g.
+the time of deliver contains the receive calls it makes.
+attach() starts a new report: the counters, timers and samples of the
+previous scenario are cleared (see reset), so report() is the one of the
+last scenario. Other phases, like building the topology, can be timed with
+timed(name), with their own Instrumentation.
+
+    build = Instrumentation()
+    with build.timed('topology_build'):
+        network = build_network('./data/sensors.csv')
+    instrumentation = Instrumentation()
+    for eq_id, epicenter in catalogue:
+        run_scenario(eq_id, epicenter, network, instrumentation=instrumentation)
+        print(instrumentation.report())
+'''
+class Instrumentation:
+    def __init__(self, sample_interval=1.0):
+        self.sample_interval = sample_interval
+        self.counters = defaultdict(int)
+        self.timers = defaultdict(float)
+        self.samples = []
+        self._wrapped = []
+        self._attached = False
+
+    def attach(self, network, env):
+        self.detach()
+        self.reset()
+        self._attached = True
+        self.network = network
+        self.env = env
+        self._call_later = env.call_later
+        self._wrap(network, 'broadcast', 'broadcast')
+        self._wrap(network, 'deliver', 'deliver')
+        self._wrap(network, 'deliver_with_delay', 'deliver_with_delay')
+        self._wrap(network.log, 'log_event', 'log_event')
+        self._wrap(env, 'call_later', 'schedule')
+        self._wrap(env, 'cancel', 'cancel')
+        if network.sensors:
+            sensor_class = type(network.sensors[0])
+            self._wrap(sensor_class, 'receive', 'receive')
+            self._wrap(sensor_class, 'detect_p_wave', 'detect_p_wave')
+        self._sample()
+
+    def detach(self):
+        for obj, name, original in reversed(self._wrapped):
+            if original is None:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, original)
+        self._wrapped = []
+        self._attached = False
+
+    # Clears the counters, timers and samples for the next scenario
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+        self.samples = []
+
+    @contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += time.perf_counter() - start
+            self.counters[name] += 1
+
+    def _wrap(self, obj, name, key):
+        original = vars(obj).get(name)
+        method = getattr(obj, name)
+        counters, timers, clock = self.counters, self.timers, time.perf_counter
+
+        def timed(*args):
+            start = clock()
+            try:
+                return method(*args)
+            finally:
+                timers[key] += clock() - start
+                counters[key] += 1
+
+        setattr(obj, name, timed)
+        self._wrapped.append((obj, name, original))
+
+    def _sample(self):
+        if not self._attached:
+            return
+        self.samples.append((self.env.now, self.env.queue_size, self.network.messages_sent,
+                             self.network.messages_delivered, len(self.network.log)))
+        self._call_later(self.sample_interval, self._sample)
+
+    # Calls, total and mean time of every instrumented path
+    def report(self):
+        names = sorted(set(self.counters) | set(self.timers))
+        report = pd.DataFrame({'calls': [self.counters[name] for name in names],
+                               'total_s': [self.timers[name] for name in names]},
+                              index=pd.Index(names, name='path'))
+        report['mean_us'] = 1e6 * report.total_s / report.calls.where(report.calls > 0)
+        return report
+
+    def samples_to_dataframe(self):
+        return pd.DataFrame(self.samples, columns=['time', 'queue_size', 'messages_sent',
+                                                   'messages_delivered', 'log_rows'])
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:24:47 2026
+"""
+
+import heapq
+import simpy
+
+
+'''
+Simulation backends.
+Every event of the model is a fixed delay followed by a call: the arrival of
+the P-wave, the delivery of a message and the end of a waiting window. So the
+sensors only need a clock (now) and call_later(delay, callback, *args), which
+calls callback(*args) at now + delay. Both backends below give that interface:
+
+- SimPyKernel is a simpy.Environment, call_later is a timeout with a callback,
+  so SimPy processes can still be mixed in.
+- HeapKernel is a plain heapq of (time, id, callback, args). It has none of
+  the generator, Process and Event objects of SimPy, which makes it much
+  faster at millions of events.
+
+Events at the same time are run in the order they were scheduled in both
+backends, so a simulation gives the same log with either of them.
+scheduled counts the calls to call_later.
+
+call_later returns a handle of the timer, which can be given to cancel() (the
+callback will not be called) or rearm() (cancels it and schedules the same
+call again after a new delay). Cancelled timers are dropped from the queue:
+they are skipped when they come first, and the queue is compacted as soon as
+more than half of it is cancelled, so stale timers neither wake up nor pile
+up in the queue. queue_size only counts the live timers.
+'''
+class SimPyKernel(simpy.Environment):
+    def __init__(self, initial_time=0):
+        super().__init__(initial_time)
+        self.scheduled = 0
+        self.cancelled = 0
+        self._cancelled = set()
+
+    def call_later(self, delay, callback, *args):
+        self.scheduled += 1
+        event = self.timeout(delay)
+        event.timer = (callback, args)
+        event.callbacks.append(lambda _: callback(*args))
+        return event
+
+    def cancel(self, event):
+        if not event.callbacks or event in self._cancelled:
+            return  # already called or cancelled
+        event.callbacks.clear()
+        self.cancelled += 1
+        self._cancelled.add(event)
+        if len(self._cancelled) > len(self._queue) // 2:
+            self._compact()
+
+    def rearm(self, event, delay):
+        if not event.callbacks:
+            raise ValueError("Cannot rearm a timer which was called or cancelled")
+        self.cancel(event)
+        callback, args = event.timer
+        return self.call_later(delay, callback, *args)
+
+    def _compact(self):
+        cancelled = self._cancelled
+        self._queue[:] = [entry for entry in self._queue if entry[3] not in cancelled]
+        heapq.heapify(self._queue)
+        cancelled.clear()
+
+    # Drops the cancelled timers at the head of the queue
+    def _skip_cancelled(self):
+        queue, cancelled = self._queue, self._cancelled
+        while queue and queue[0][3] in cancelled:
+            cancelled.discard(heapq.heappop(queue)[3])
+
+    def peek(self):
+        self._skip_cancelled()
+        return super().peek()
+
+    def step(self):
+        self._skip_cancelled()
+        super().step()
+
+    # SimPy schedules its (empty) until event again when it stops the run,
+    # it is dropped so that queue_size only counts the timers
+    def run(self, until=None):
+        result = super().run(until)
+        queue = self._queue
+        if (until is not None and queue and queue[0][0] == self.now and queue[0][3].callbacks == []
+                and queue[0][3] not in self._cancelled):
+            heapq.heappop(queue)
+        return result
+
+    @property
+    def queue_size(self):
+        return len(self._queue) - len(self._cancelled)
+
+
+# The timers of HeapKernel are [time, id, callback, args] lists, a cancelled
+# timer has callback None
+class HeapKernel:
+    def __init__(self, initial_time=0):
+        self.now = initial_time
+        self._queue = []
+        self._eid = 0
+        self._stale = 0
+        self.cancelled = 0
+
+    def call_later(self, delay, callback, *args):
+        if delay < 0:
+            raise ValueError(f"Negative delay {delay}")
+        timer = [self.now + delay, self._eid, callback, args]
+        heapq.heappush(self._queue, timer)
+        self._eid += 1
+        return timer
+
+    def cancel(self, timer):
+        if timer[2] is None:
+            return
+        timer[2] = None
+        self.cancelled += 1
+        self._stale += 1
+        if self._stale > len(self._queue) // 2:
+            self._queue = [t for t in self._queue if t[2] is not None]
+            heapq.heapify(self._queue)
+            self._stale = 0
+
+    def rearm(self, timer, delay):
+        callback, args = timer[2], timer[3]
+        if callback is None:
+            raise ValueError("Cannot rearm a timer which was called or cancelled")
+        self.cancel(timer)
+        return self.call_later(delay, callback, *args)
+
+    @property
+    def queue_size(self):
+        return len(self._queue) - self._stale
+
+    @property
+    def scheduled(self):
+        return self._eid
+
+    # Drops the cancelled timers at the head of the queue
+    def _skip_cancelled(self):
+        queue = self._queue
+        while queue and queue[0][2] is None:
+            heapq.heappop(queue)
+            self._stale -= 1
+
+    # Time of the next event, inf if there is none
+    def peek(self):
+        self._skip_cancelled()
+        return self._queue[0][0] if self._queue else float('inf')
+
+    def step(self):
+        self._skip_cancelled()
+        timer = heapq.heappop(self._queue)
+        self.now, callback, args = timer[0], timer[2], timer[3]
+        timer[2] = None  # called, cancel() does nothing now
+        callback(*args)
+
+    # Like simpy.Environment.run: events at until are not run
+    def run(self, until=None):
+        if until is None:
+            while self.peek() < float('inf'):
+                self.step()
+            return
+        if until <= self.now:
+            raise ValueError(f"until ({until}) must be greater than the current time ({self.now})")
+        while self.peek() < until:
+            self.step()
+        self.now = until
+
+
+BACKENDS = {'simpy': SimPyKernel, 'heap': HeapKernel}
+
+
+def make_kernel(backend='simpy'):
+    try:
+        return BACKENDS[backend]()
+    except KeyError:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {sorted(BACKENDS)}") from None
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:30:51 2026
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from plum_topology import Topology
+
+
+SENSOR_COLUMNS = ['id', 'latitude', 'longitude']
+SENSOR_DTYPES = {'id': str, 'latitude': 'float64', 'longitude': 'float64'}
+
+
+'''
+Bulk loader of sensor networks.
+The sensor file (CSV or Parquet, with the id, latitude and longitude columns
+of sensors.csv) is read with explicit dtypes into three arrays in one pass,
+and checked for duplicate IDs and bad coordinates before anything is built.
+
+With cache=True the parsed arrays are also saved next to the file, in
+<file>.cache/, as .npy files. Later loads of the same (unchanged) file
+memory-map them instead of parsing the file again.
+'''
+def read_sensor_table(path, cache=False):
+    if cache:
+        cached = _read_cache(path)
+        if cached is not None:
+            return cached
+
+    if path.endswith('.parquet'):
+        table = pd.read_parquet(path, columns=SENSOR_COLUMNS).astype(SENSOR_DTYPES)
+    else:
+        table = pd.read_csv(path, usecols=SENSOR_COLUMNS, dtype=SENSOR_DTYPES)
+    if table['id'].isna().any():
+        raise ValueError(f"{path}: {table['id'].isna().sum()} sensors without an ID")
+    ids = table['id'].to_numpy(dtype=str)
+    lat = table['latitude'].to_numpy()
+    lon = table['longitude'].to_numpy()
+    validate_sensors(ids, lat, lon, path)
+
+    if cache:
+        _write_cache(path, ids, lat, lon)
+    return ids, lat, lon
+
+
+def validate_sensors(ids, lat, lon, source='sensors'):
+    unique, counts = np.unique(ids, return_counts=True)
+    if np.any(counts > 1):
+        duplicates = unique[counts > 1]
+        raise ValueError(f"{source}: {len(duplicates)} duplicate sensor IDs, e.g. {duplicates[:5].tolist()}")
+    bad = ~(np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180))
+    if np.any(bad):
+        raise ValueError(f"{source}: {np.count_nonzero(bad)} sensors with missing or invalid "
+                         f"coordinates, e.g. {ids[bad][:5].tolist()}")
+
+
+# Topology of the sensors in path
+def load_topology(path, cell_km=30, cache=False):
+    ids, lat, lon = read_sensor_table(path, cache)
+    return Topology(ids.tolist(), np.column_stack((lat, lon)), cell_km)
+
+
+def _cache_dir(path):
+    return path + '.cache'
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _read_cache(path):
+    directory = _cache_dir(path)
+    try:
+        with open(os.path.join(directory, 'source.json')) as f:
+            if json.load(f) != _source_stamp(path):
+                return None
+        return tuple(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+                     for name in ('ids', 'latitude', 'longitude'))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path, ids, lat, lon):
+    directory = _cache_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    for name, array in (('ids', ids), ('latitude', lat), ('longitude', lon)):
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+    # written last, so a half written cache is never used
+    with open(os.path.join(directory, 'source.json'), 'w') as f:
+        json.dump(_source_stamp(path), f)
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:21:50 2026
+"""
+
+import logging
+import os
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+
+COLUMNS = ['time', 'sensor_id', 'status', 'action', 'event', 'sender_id', 'reaction', 'value', 'event_id']
+
+# Known values of the categorical columns. Other values are added to the
+# categories of the log when they are first logged.
+STATUSES = ('Observation', 'Detection', 'Alerted', 'Decision')
+ACTIONS = ('Produce', 'Receive', 'ChangeStatus', 'EventCancelation', 'Suppress')
+EVENTS = ('NaN', 'P_Wave_Detection', 'ConfirmedAlert', 'P_Wave_Update')
+REACTIONS = ('NaN', 'WaitForConfirmation', 'StatusToAlerted', 'BackToObservation', 'Ignore')
+
+
+'''
+Compact identity of a confirmed event: the positions of the two sensors
+whose detections confirmed it, and their detection times in integer
+milliseconds. The sensors use it instead of the old event_id strings (sensor
+IDs followed by hhmmss.sss times), so confirming an event needs no string
+work and sensor IDs can have any length. The string is only rendered by
+render_event_id, when the log is exported.
+'''
+EventKey = namedtuple('EventKey', ['first_sensor', 'first_time', 'second_sensor', 'second_time'])
+
+
+# Time of a detection in the event key
+def time_key(t):
+    return int(round(t * 1000))
+
+
+def format_time(t):
+    h, rem = divmod(float(t), 3600)
+    m, s = divmod(rem, 60)
+    return f"{h:02.0f}{m:02.0f}{s:06.3f}"
+
+
+# The readable event ID of key, ids are the sensor IDs by position
+def render_event_id(key, ids):
+    return (f"{ids[key.first_sensor]}{format_time(key.first_time / 1000)}"
+            f"{ids[key.second_sensor]}{format_time(key.second_time / 1000)}")
+
+
+'''
+The log of one simulation. All events are recorded here.
+Every column is a preallocated NumPy array which grows by doubling, so a
+record costs a few bytes instead of a dict. time and value are float64
+(value is NaN when there is no value), the other columns are stored as
+integer codes of their categories. sensor_id and sender_id share the same
+categories, the sensor IDs, with 'NaN' for no sender. event_id stores the
+EventKey of the record (if any) as a code as well, and the keys are rendered
+as strings only in to_dataframe.
+Each Network has its own log, so several simulations can run in the same
+process.
+
+With a sink (CsvSink, ParquetSink or NullSink) the log is written out every
+chunk_size records and at flush(), and the arrays are reused, so the memory
+of a run stays flat however long it is. eq_id, when set, is added as a column
+to the DataFrame and to everything written to the sink.
+metadata holds facts about the whole run (e.g. stop_reason and stop_time, see
+run_scenario), it is given to the DataFrame as its attrs, and to the sink
+with write_metadata.
+'''
+class SimulationLog:
+    def __init__(self, capacity=1024, sensor_ids=(), sink=None, chunk_size=65536, eq_id=None):
+        self.sink = sink
+        self.chunk_size = chunk_size
+        self.eq_id = eq_id
+        if sink is not None:
+            capacity = min(capacity, chunk_size)
+        self.size = 0
+        self.time = np.empty(capacity)
+        self.value = np.empty(capacity)
+        self.codes = {column: np.empty(capacity, dtype=np.int32)
+                      for column in ('sensor_id', 'status', 'action', 'event', 'sender_id', 'reaction', 'event_id')}
+        self.categories = {'sensor': ['NaN', *sensor_ids], 'status': list(STATUSES),
+                           'action': list(ACTIONS), 'event': list(EVENTS),
+                           'reaction': list(REACTIONS), 'event_key': []}
+        self.lookup = {name: {value: code for code, value in enumerate(values)}
+                       for name, values in self.categories.items()}
+        self.messages = []
+        self.metadata = {}
+
+    def __len__(self):
+        return self.size
+
+    def log_event(self, time, sensor_id, sensor_status, action, event_type, sender_id, reaction, value,
+                  event_key=None):
+        if self.size == len(self.time):
+            self._grow()
+        i = self.size
+        self.time[i] = round(time, 4)
+        self.codes['sensor_id'][i] = self.code('sensor', sensor_id)
+        self.codes['status'][i] = self.code('status', sensor_status)
+        self.codes['action'][i] = self.code('action', action)
+        self.codes['event'][i] = self.code('event', event_type)
+        self.codes['sender_id'][i] = self.code('sensor', sender_id)
+        self.codes['reaction'][i] = self.code('reaction', reaction)
+        self.codes['event_id'][i] = -1 if event_key is None else self.code('event_key', event_key)
+        self.value[i] = np.nan if value is None or value == 'NaN' else value
+        self.size += 1
+        if self.sink is not None and self.size >= self.chunk_size:
+            self.flush()
+
+    # Integer code of value in the given categories
+    def code(self, name, value):
+        lookup = self.lookup[name]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.categories[name])
+            self.categories[name].append(value)
+        return code
+
+    def _grow(self):
+        capacity = 2 * len(self.time)
+        self.time = np.resize(self.time, capacity)
+        self.value = np.resize(self.value, capacity)
+        self.codes = {column: np.resize(codes, capacity) for column, codes in self.codes.items()}
+
+    # Text messages of the run (see SimulationLogHandler), next to the records
+    def log_message(self, time, sensor_id, level, message):
+        self.messages.append((round(time, 4), sensor_id, level, message))
+
+    def messages_to_dataframe(self):
+        return pd.DataFrame(self.messages, columns=['time', 'sensor_id', 'level', 'message'])
+
+    def clear(self):
+        self.size = 0
+        self._clear_event_keys()
+        self.messages.clear()
+        self.metadata.clear()
+
+    # Writes the records to the sink and clears the log. The event keys are
+    # coded again in every chunk, so a chunk only renders its own keys.
+    def flush(self):
+        if self.sink is not None and self.size:
+            self.sink.write(self.to_dataframe())
+            self.size = 0
+            self._clear_event_keys()
+
+    # The interned event keys, only used by the records in the log
+    def _clear_event_keys(self):
+        self.categories['event_key'].clear()
+        self.lookup['event_key'].clear()
+
+    # The log as a DataFrame. The columns are views of the log arrays, so
+    # the log should not be cleared while the DataFrame is in use.
+    def to_dataframe(self):
+        n = self.size
+        columns = {'time': self.time[:n]}
+        for column, codes in self.codes.items():
+            if column == 'event_id':
+                ids = self.categories['sensor'][1:]
+                categories = [render_event_id(key, ids) for key in self.categories['event_key']]
+            else:
+                name = 'sensor' if column in ('sensor_id', 'sender_id') else column
+                categories = self.categories[name]
+            columns[column] = pd.Categorical.from_codes(codes[:n], categories=categories)
+        columns['value'] = self.value[:n]
+        if self.eq_id is None:
+            frame = pd.DataFrame(columns, columns=COLUMNS, copy=False)
+        else:
+            columns['eq_id'] = np.full(n, self.eq_id, dtype=object)
+            frame = pd.DataFrame(columns, columns=COLUMNS + ['eq_id'], copy=False)
+        frame.attrs.update(self.metadata)
+        return frame
+
+    def save_to_csv(self, filename='./outputs/simulation_log.csv'):
+        self.to_dataframe().to_csv(filename, index=False, na_rep='NaN')
+
+
+'''
+Handler of the 'plum' logger which keeps the messages of the sensors in the
+SimulationLog of their run (the simulation_log field of the record).
+Records without it, like the start of a simulation, are ignored.
+    logging.getLogger('plum').addHandler(SimulationLogHandler())
+'''
+class SimulationLogHandler(logging.Handler):
+    def emit(self, record):
+        log = getattr(record, 'simulation_log', None)
+        if log is not None:
+            log.log_message(record.sim_time, record.sensor_id, record.levelname, record.getMessage())
+
+
+'''
+Sinks of the log. write(frame) is called with chunks of the log as
+DataFrames, and close() once everything is written. rows counts the records
+written so far.
+write_metadata(metadata) is called once per scenario with the metadata of its
+log (eq_id, stop_reason, stop_time, see run_scenario), which are kept in
+metadata, one dict per scenario. The file sinks write them at close() next to
+the log, to <name>_metadata.csv.
+'''
+class LogSink:
+    def __init__(self):
+        self.rows = 0
+        self.metadata = []
+
+    def write(self, frame):
+        self.rows += len(frame)
+
+    def write_metadata(self, metadata):
+        self.metadata.append(dict(metadata))
+
+    # The metadata of the scenarios, one row per scenario
+    def metadata_frame(self):
+        return pd.DataFrame(self.metadata)
+
+    def close(self):
+        pass
+
+    def save_metadata(self, filename):
+        if self.metadata:
+            self.metadata_frame().to_csv(os.path.splitext(filename)[0] + '_metadata.csv', index=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Drops every record, for benchmarking the simulation without any output
+class NullSink(LogSink):
+    pass
+
+
+class CsvSink(LogSink):
+    def __init__(self, filename, na_rep='NaN'):
+        super().__init__()
+        self.file = open(filename, 'w', newline='')
+        self.na_rep = na_rep
+
+    def write(self, frame):
+        frame.to_csv(self.file, header=self.rows == 0, index=False, na_rep=self.na_rep)
+        super().write(frame)
+
+    def close(self):
+        self.file.close()
+        self.save_metadata(self.file.name)
+
+
+# Each chunk is written as one or more row groups of row_group_size rows.
+# Needs pyarrow.
+class ParquetSink(LogSink):
+    def __init__(self, filename, row_group_size=65536):
+        super().__init__()
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("ParquetSink needs pyarrow: pip install pyarrow") from None
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.filename = filename
+        self.row_group_size = row_group_size
+        self.writer = None
+
+    def write(self, frame):
+        # Categories differ between chunks, the file stores plain strings
+        categorical = frame.select_dtypes('category').columns
+        frame = frame.astype({column: str for column in categorical})
+        table = self.pa.Table.from_pandas(frame, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.filename, table.schema)
+        self.writer.write_table(table, row_group_size=self.row_group_size)
+        super().write(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.save_metadata(self.filename)
+
+
+# Sink for a path: 'null' for a NullSink, *.parquet for a ParquetSink and
+# anything else for a CsvSink
+def open_sink(path):
+    if path == 'null':
+        return NullSink()
+    if path.endswith('.parquet'):
+        return ParquetSink(path)
+    return CsvSink(path)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:23:53 2026
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+
+import plum_des_simulation as plum
+from plum_log import SimulationLog
+from plum_kernel import make_kernel
+from plum_streams import realisation_streams, stream_key, uniforms, values
+
+
+'''
+Monte Carlo mode for the reliability of the alerts.
+Realisation r has its own random streams (see plum_streams). For a batch of
+realisations, the misses (miss_probability), the false triggers
+(false_detection_probability, at a uniform time in the simulated duration)
+and the first peak displacement of all the sensors are drawn at once as
+(realisations x sensors) arrays from the streams of the realisations. Each
+realisation then runs through the Sensor state machine on the same network,
+the later peaks of a sensor coming from its own stream.
+So a realisation does not depend on the others nor on the batches, and a
+run can be sharded: the shard with first=1000 gives realisations 1000... of
+the full run.
+
+Only a few numbers are kept per realisation (see MonteCarloResult), the log
+of a realisation is cleared once they are read, so the memory does not grow
+with the number of realisations.
+'''
+def draw_realisations(seed, realisations, n_sensors, duration,
+                      miss_probability, false_detection_probability):
+    key = stream_key(seed)
+    r, sensors = np.asarray(realisations)[:, None], np.arange(n_sensors)
+    missed = uniforms(key, r, 'miss', sensors, 0) < miss_probability
+    false_triggers = np.where(uniforms(key, r, 'false_trigger', sensors, 0) < false_detection_probability,
+                              uniforms(key, r, 'false_time', sensors, 0) * duration, np.nan)
+    peaks = values('peak', uniforms(key, r, 'peak', sensors, 0))
+    return missed, false_triggers, peaks
+
+
+def run_monte_carlo(network, epicenter, n_realisations, seed=0, batch_size=1000, duration=120,
+                    miss_probability=None, false_detection_probability=None, backend='simpy', first=0):
+    if miss_probability is None:
+        miss_probability = plum.miss_probability
+    if false_detection_probability is None:
+        false_detection_probability = plum.false_detection_probability
+
+    result = MonteCarloResult(n_realisations, network.topology.ids)
+    log = SimulationLog(sensor_ids=network.topology.ids)
+    lat, lon = network.topology.locations.T
+    first_arrival = np.min(plum.epicentral_distances(lat, lon, epicenter)) / plum.P_WAVE_SPEED_KM_PER_S
+
+    n = len(network.sensors)
+    for start in range(0, n_realisations, batch_size):
+        size = min(batch_size, n_realisations - start)
+        missed, false_triggers, peaks = draw_realisations(
+            seed, np.arange(first + start, first + start + size), n,
+            duration, miss_probability, false_detection_probability)
+        for r in range(size):
+            streams = realisation_streams(seed, first + start + r, n)
+            streams.prefill('peak', peaks[r])
+            env = make_kernel(backend)
+            log.clear()
+            network.reset(env, log=log, streams=streams)
+            plum.simulate_earthquake(env, epicenter, network.sensors, missed[r], false_triggers[r])
+            _, stop_time = plum.run_until_quiescent(env, network, duration)
+            result.record(start + r, log, first_arrival, int(missed[r].sum()),
+                          int(np.count_nonzero(~np.isnan(false_triggers[r]))), stop_time)
+    return result
+
+
+'''
+Statistics of a Monte Carlo run, one value per realisation:
+n_alerted (sensors which reached Alerted), first_alert (time of the first
+alert, NaN if none), n_cancelled (EventCancelation of the sensors), n_missed
+and n_false_triggers (the draws), and false_alert (the first alert came
+before the P-wave reached any sensor, so it was raised by noise only).
+stop_time is the time at which the realisation stopped (the network was
+quiescent, or duration).
+alert_count counts for each sensor the realisations where it was alerted.
+'''
+class MonteCarloResult:
+    def __init__(self, n_realisations, sensor_ids):
+        self.sensor_ids = list(sensor_ids)
+        self.n_alerted = np.zeros(n_realisations, dtype=np.int32)
+        self.first_alert = np.full(n_realisations, np.nan)
+        self.n_cancelled = np.zeros(n_realisations, dtype=np.int32)
+        self.n_missed = np.zeros(n_realisations, dtype=np.int32)
+        self.n_false_triggers = np.zeros(n_realisations, dtype=np.int32)
+        self.false_alert = np.zeros(n_realisations, dtype=bool)
+        self.stop_time = np.full(n_realisations, np.nan)
+        self.alert_count = np.zeros(len(self.sensor_ids), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.n_alerted)
+
+    def record(self, r, log, first_arrival, n_missed, n_false_triggers, stop_time=np.nan):
+        n = len(log)
+        action = log.codes['action'][:n]
+        alerts = action == log.lookup['action']['ChangeStatus']
+        # codes of the sensor IDs start at 1, 0 is 'NaN'
+        alerted = np.unique(log.codes['sensor_id'][:n][alerts]) - 1
+        self.n_alerted[r] = len(alerted)
+        self.alert_count[alerted] += 1
+        if len(alerted):
+            self.first_alert[r] = log.time[:n][alerts].min()
+            self.false_alert[r] = self.first_alert[r] < first_arrival
+        self.n_cancelled[r] = np.count_nonzero(action == log.lookup['action']['EventCancelation'])
+        self.n_missed[r] = n_missed
+        self.n_false_triggers[r] = n_false_triggers
+        self.stop_time[r] = stop_time
+
+    def summary(self):
+        alerted = self.n_alerted > 0
+        first_alert = self.first_alert[alerted]
+        return {
+            'realisations': len(self),
+            'alert_probability': alerted.mean(),
+            'no_alert_probability': 1 - alerted.mean(),
+            'false_alert_probability': self.false_alert.mean(),
+            'mean_coverage': self.n_alerted.mean() / len(self.sensor_ids),
+            'mean_first_alert': first_alert.mean() if len(first_alert) else np.nan,
+            'median_first_alert': np.median(first_alert) if len(first_alert) else np.nan,
+            'p95_first_alert': np.percentile(first_alert, 95) if len(first_alert) else np.nan,
+            'mean_cancelled': self.n_cancelled.mean(),
+            'mean_stop_time': self.stop_time.mean(),
+        }
+
+    # Probability of each sensor to be alerted
+    def sensor_alert_probability(self):
+        return pd.Series(self.alert_count / len(self), index=self.sensor_ids, name='alert_probability')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo reliability of the alerts")
+    parser.add_argument('--earthquakes', default='./data/earthquake.csv')
+    parser.add_argument('--sensors', default='./data/sensors.csv')
+    parser.add_argument('--realisations', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--backend', default='simpy')
+    args = parser.parse_args()
+
+    network = plum.build_network(args.sensors)
+    rows = []
+    for _, earthquake in pd.read_csv(args.earthquakes).iterrows():
+        result = run_monte_carlo(network, (earthquake.latitude, earthquake.longitude),
+                                 args.realisations, args.seed, backend=args.backend)
+        rows.append({'eq_id': earthquake.id, **result.summary()})
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:22:29 2026
+"""
+
+import argparse
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from plum_des_simulation import build_network, run_scenario
+from plum_kernel import BACKENDS
+from plum_log import open_sink
+from plum_streams import ScenarioStreams
+
+
+'''
+Scenario runner for catalogues of earthquakes.
+Every scenario gets its own seed, derived from a single root seed and the
+position of the scenario in the catalogue, and its random values come from
+the streams of that seed (see plum_streams), one per sensor, so the result of
+a scenario does not depend on which worker runs it or in which order. A run with workers=1
+and a run with a process pool give bit-identical logs for the same seeds.
+
+Each scenario log is written to its own partition file in partition_dir as
+soon as the scenario finishes, and the partitions are merged once at the end.
+With a sink (see plum_log) nothing is merged in memory: every finished
+scenario is written to the sink in catalogue order and dropped, so the memory
+does not grow with the number of scenarios. A serial run without partitions
+streams the records into the sink in chunks while each scenario runs.
+The metadata of every scenario (eq_id, stop_reason, stop_time) is given to
+the sink, which writes it next to the log (see plum_log), or without a sink
+kept in attrs['scenarios'] of the merged log.
+
+The partitions are also the checkpoints of the run. A partition is written to
+a temporary file and renamed once complete, so a partition file always holds a
+whole scenario, and checkpoint.json in partition_dir keeps the settings of the
+run and the seed of every scenario. With resume=True a run which was stopped
+(e.g. pre-empted) skips the scenarios which have a partition and only runs the
+others. As the seeds are fixed, the result is identical to a run which was
+never stopped. Nothing else has to be saved between scenarios: the network
+is reset at the start of every scenario, so its state does not carry over.
+Without resume an old checkpoint in partition_dir is cleared first, and
+resume raises an error if partition_dir has no checkpoint.
+'''
+
+# One seed per scenario, derived from root_seed
+def scenario_seeds(root_seed, n_scenarios):
+    children = np.random.SeedSequence(root_seed).spawn(n_scenarios)
+    return [int(child.generate_state(1, np.uint64)[0]) for child in children]
+
+
+def partition_path(partition_dir, index, eq_id):
+    return os.path.join(partition_dir, f"{index:06d}_{eq_id}.pkl")
+
+
+def checkpoint_path(partition_dir):
+    return os.path.join(partition_dir, 'checkpoint.json')
+
+
+# Positions in the catalogue of the scenarios which have a partition
+def completed_scenarios(partition_dir):
+    return sorted(int(os.path.basename(path).split('_', 1)[0])
+                  for path in glob.glob(os.path.join(partition_dir, '*.pkl')))
+
+
+# Starts or resumes the checkpoint of a run, returns the completed scenarios.
+# A resume never deletes a partition, only the .tmp files of the partitions
+# which were being written when the run stopped.
+def open_checkpoint(partition_dir, settings, resume):
+    os.makedirs(partition_dir, exist_ok=True)
+    path = checkpoint_path(partition_dir)
+    for stale in glob.glob(os.path.join(partition_dir, '*.pkl.tmp')):
+        os.remove(stale)
+    if resume:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No checkpoint to resume in {partition_dir}, run it without "
+                                    "resume to start a new run")
+        with open(path) as f:
+            if json.load(f) != settings:
+                raise ValueError(f"{path} is a checkpoint of another run, resume it with the same "
+                                 "settings or use another partition directory")
+        return set(completed_scenarios(partition_dir))
+    for old in glob.glob(os.path.join(partition_dir, '*.pkl')) + [path]:
+        if os.path.exists(old):
+            os.remove(old)
+    with open(path, 'w') as f:
+        json.dump(settings, f, indent=1)
+    return set()
+
+
+# The networks built by this process, so each worker builds a network once
+_networks = {}
+
+
+def get_network(sensors_file):
+    if sensors_file not in _networks:
+        _networks[sensors_file] = build_network(sensors_file)
+    return _networks[sensors_file]
+
+
+# Runs one scenario of the catalogue, used by the workers of the pool
+def run_partition(task, sink=None):
+    index, eq_id, epicenter, seed, sensors_file, duration, partition_dir, backend = task
+    network = get_network(sensors_file)
+    log = run_scenario(eq_id, epicenter, network, duration, backend=backend, sink=sink,
+                       streams=ScenarioStreams(seed, len(network.sensors)))
+    if partition_dir is None or sink is not None:
+        return log
+    path = partition_path(partition_dir, index, eq_id)
+    log.to_pickle(path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def run_scenarios(earthquakes, sensors_file='./data/sensors.csv', root_seed=0,
+                  workers=None, duration=120, partition_dir=None, backend='simpy', sink=None,
+                  resume=False):
+    seeds = scenario_seeds(root_seed, len(earthquakes))
+    tasks = [(index, earthquake.id, (earthquake.latitude, earthquake.longitude), seed,
+              sensors_file, duration, partition_dir, backend)
+             for index, ((_, earthquake), seed) in enumerate(zip(earthquakes.iterrows(), seeds))]
+    completed = set()
+    if partition_dir is not None:
+        settings = {'sensors_file': sensors_file, 'root_seed': root_seed, 'duration': duration,
+                    'backend': backend, 'scenarios': [[task[1], task[3]] for task in tasks]}
+        completed = open_checkpoint(partition_dir, settings, resume)
+
+    if workers == 1 and sink is not None and partition_dir is None:
+        for task in tasks:
+            run_partition(task, sink)
+        return sink.rows
+    pending = [task for task in tasks if task[0] not in completed]
+    if workers == 1:
+        return collect(in_order(tasks, completed, map(run_partition, pending)), partition_dir, sink)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return collect(in_order(tasks, completed, pool.map(run_partition, pending)), partition_dir, sink)
+
+
+# The partitions of all the scenarios in order, completed ones from the checkpoint
+def in_order(tasks, completed, results):
+    for index, eq_id, *_, partition_dir, _ in tasks:
+        yield partition_path(partition_dir, index, eq_id) if index in completed else next(results)
+
+
+# Merges the scenario logs (or partition paths) as they come, in order. The
+# metadata of every scenario (the attrs of its log, kept in its partition)
+# goes to the sink, or to attrs['scenarios'] of the merged log.
+def collect(results, partition_dir, sink):
+    logs = (pd.read_pickle(result) if partition_dir is not None else result for result in results)
+    if sink is None:
+        logs = list(logs)
+        merged = pd.concat(logs, ignore_index=True) if logs else pd.DataFrame()
+        merged.attrs = {'scenarios': [dict(log.attrs) for log in logs]}
+        return merged
+    for log in logs:
+        sink.write(log)
+        sink.write_metadata(log.attrs)
+    return sink.rows
+
+'''
+Checks that every backend of plum_kernel gives the same log as SimPy for the
+catalogue, with the same seed. Raises an AssertionError naming the first
+differing backend, otherwise returns the number of rows compared.
+'''
+def compare_backends(earthquakes, sensors_file='./data/sensors.csv', root_seed=0, duration=120):
+    reference = run_scenarios(earthquakes, sensors_file, root_seed, workers=1,
+                              duration=duration, backend='simpy')
+    for backend in sorted(set(BACKENDS) - {'simpy'}):
+        log = run_scenarios(earthquakes, sensors_file, root_seed, workers=1,
+                            duration=duration, backend=backend)
+        if not log.equals(reference):
+            raise AssertionError(f"Backend {backend!r} gives a different log than 'simpy'")
+    return len(reference)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a catalogue of earthquake scenarios")
+    parser.add_argument('--earthquakes', default='./data/earthquake.csv')
+    parser.add_argument('--sensors', default='./data/sensors.csv')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--duration', type=float, default=120)
+    parser.add_argument('--partitions', default='./outputs/partitions',
+                        help="directory of the scenario partitions, '' for none")
+    parser.add_argument('--output', default='./outputs/log_file.csv',
+                        help="*.csv, *.parquet or 'null' (no output)")
+    parser.add_argument('--backend', default='simpy', choices=sorted(BACKENDS))
+    parser.add_argument('--resume', action='store_true',
+                        help="skip the scenarios already in the partitions of a stopped run")
+    parser.add_argument('--compare-backends', action='store_true',
+                        help="check that all backends give the same log and exit")
+    args = parser.parse_args()
+
+    if args.compare_backends:
+        rows = compare_backends(pd.read_csv(args.earthquakes), args.sensors, args.seed, args.duration)
+        print(f"All backends ({', '.join(sorted(BACKENDS))}) agree on {rows} log rows")
+        raise SystemExit
+
+    with open_sink(args.output) as log_file:
+        run_scenarios(pd.read_csv(args.earthquakes), args.sensors, args.seed, args.workers,
+                      args.duration, args.partitions or None, args.backend, sink=log_file,
+                      resume=args.resume)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:40:59 2026
+"""
+
+import numpy as np
+
+from plum_log import STATUSES
+
+
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+OBSERVATION, DETECTION, ALERTED, DECISION = (STATUS_CODES[status] for status in STATUSES)
+
+
+'''
+Struct-of-arrays state of the sensors of a network, for one run.
+Every field of the sensors is one NumPy array indexed by the position of the
+sensor in the network: status codes (see STATUSES), detections as the
+position of the detecting sensor (-1 for none) and a time (NaN for none),
+peaks and times as float64 (NaN for none) and flags as bool. The few fields
+which hold objects (event_id, event_location, event_origin) are object arrays
+and received_updates is only kept for the sensors which have any.
+The Sensor objects are thin views of one row of the store (see the fields
+below), and questions about the whole network are one array operation, e.g.
+alerted_at(t). alerted_time is the time each sensor became Alerted.
+reset() clears it for the next run.
+'''
+class SensorState:
+    FLOATS = ('alerted_time', 'first_time', 'second_time', 'third_time', 'fourth_time',
+              'p_detection', 's_detection', 'P_peak', 'S_peak', 'peak_displacement',
+              'previous_update_timestamp')
+    POSITIONS = ('first_sensor', 'second_sensor', 'third_sensor', 'fourth_sensor')
+    FLAGS = ('received_detection', 'received_confirmed', 'p_update', 's_update')
+    OBJECTS = ('event_id', 'event_location', 'event_origin')
+
+    def __init__(self, ids, positions=None):
+        self.ids = list(ids)
+        self.positions = positions if positions is not None else {
+            sensor_id: i for i, sensor_id in enumerate(self.ids)}
+        n = len(self.ids)
+        self.status = np.empty(n, dtype=np.int8)
+        for name in self.FLOATS:
+            setattr(self, name, np.empty(n))
+        for name in self.POSITIONS:
+            setattr(self, name, np.empty(n, dtype=np.int32))
+        for name in self.FLAGS:
+            setattr(self, name, np.empty(n, dtype=bool))
+        for name in self.OBJECTS:
+            setattr(self, name, np.empty(n, dtype=object))
+        self.received_updates = {}
+        self.reset()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def reset(self):
+        self.status.fill(OBSERVATION)
+        for name in self.FLOATS:
+            getattr(self, name).fill(np.nan)
+        for name in self.POSITIONS:
+            getattr(self, name).fill(-1)
+        for name in self.FLAGS:
+            getattr(self, name).fill(False)
+        for name in self.OBJECTS:
+            getattr(self, name).fill(None)
+        self.received_updates.clear()
+
+    # Positions of the sensors in status now
+    def in_status(self, status):
+        return np.flatnonzero(self.status == STATUS_CODES[status])
+
+    # Positions of the sensors which were Alerted at time t
+    def alerted_at(self, t):
+        return np.flatnonzero(self.alerted_time <= t)
+
+    # Number of sensors in each status now
+    def status_counts(self):
+        counts = np.bincount(self.status, minlength=len(STATUSES))
+        return dict(zip(STATUSES, counts.tolist()))
+
+
+'''
+Fields of the Sensor views. Each one reads and writes the row of its sensor
+(sensor.state, sensor.index) in one array of the store, with the values the
+sensors used before: strings for the status, (sensor_id, time) tuples or
+None for the detections, None for missing numbers.
+'''
+class StateField:
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, sensor, owner=None):
+        if sensor is None:
+            return self
+        return getattr(sensor.state, self.name)[sensor.index]
+
+    def __set__(self, sensor, value):
+        getattr(sensor.state, self.name)[sensor.index] = value
+
+
+class FloatField(StateField):
+    def __get__(self, sensor, owner=None):
+        if sensor is None:
+            return self
+        value = getattr(sensor.state, self.name)[sensor.index]
+        return None if value != value else float(value)
+
+    def __set__(self, sensor, value):
+        getattr(sensor.state, self.name)[sensor.index] = np.nan if value is None else value
+
+
+class FlagField(StateField):
+    def __get__(self, sensor, owner=None):
+        if sensor is None:
+            return self
+        return bool(getattr(sensor.state, self.name)[sensor.index])
+
+
+# Becoming Alerted is also recorded in alerted_time
+class StatusField(StateField):
+    def __get__(self, sensor, owner=None):
+        if sensor is None:
+            return self
+        return STATUSES[sensor.state.status[sensor.index]]
+
+    def __set__(self, sensor, value):
+        code = STATUS_CODES[value]
+        sensor.state.status[sensor.index] = code
+        if code == ALERTED:
+            sensor.state.alerted_time[sensor.index] = sensor.env.now
+
+
+class DetectionField(StateField):
+    def __set_name__(self, owner, name):
+        self.name = name
+        prefix = name.split('_')[0]
+        self.sensor_field = f"{prefix}_sensor"
+        self.time_field = f"{prefix}_time"
+
+    def __get__(self, sensor, owner=None):
+        if sensor is None:
+            return self
+        state = sensor.state
+        position = getattr(state, self.sensor_field)[sensor.index]
+        if position < 0:
+            return None
+        return (state.ids[position], float(getattr(state, self.time_field)[sensor.index]))
+
+    def __set__(self, sensor, value):
+        state = sensor.state
+        if value is None:
+            getattr(state, self.sensor_field)[sensor.index] = -1
+            getattr(state, self.time_field)[sensor.index] = np.nan
+        else:
+            getattr(state, self.sensor_field)[sensor.index] = state.positions[value[0]]
+            getattr(state, self.time_field)[sensor.index] = value[1]
+
+
+class UpdatesField(StateField):
+    def __get__(self, sensor, owner=None):
+        if sensor is None:
+            return self
+        return sensor.state.received_updates.setdefault(sensor.index, [])
+
+    def __set__(self, sensor, value):
+        sensor.state.received_updates[sensor.index] = value
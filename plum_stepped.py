@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:43:30 2026
+"""
+
+import argparse
+import math
+import random
+import time
+import numpy as np
+import pandas as pd
+
+import plum_des_simulation as plum
+from plum_state import OBSERVATION, DETECTION, ALERTED
+from plum_synthetic import synthetic_network
+
+
+'''
+Time-stepped engine of the PLUM decisions, for large what-if studies.
+It gives the Observation -> Detection -> Alerted transitions of
+Sensor.detect_p_wave and Sensor.receive without any event or message object:
+all the sensors are advanced in fixed steps of dt seconds with array
+operations.
+
+With flooding, a sensor broadcasts every detection of its own (P-wave or
+false trigger) whatever its status, so all the messages of a run are known
+from the detections alone. A detection and a received message act the same
+on the state: the first one starts a detection (Observation -> Detection, with
+a timer of waiting_window), the next one before the timer ends confirms it
+(Detection -> Alerted), and a timer which ends in Detection goes back to
+Observation. The engine bins these stimuli by step and, step by step, applies
+the transitions to the sensors which have some:
+
+- timers which end in the step are applied first, a detection started in step
+  s0 ends in step s0 + ceil(waiting_window / dt),
+- an Observation sensor with one stimulus starts a detection, with two or
+  more it is also confirmed in the same step,
+- a Detection sensor with a stimulus is Alerted.
+
+Error bound: stimuli keep their exact times until they are binned, so the
+errors do not add up along the network. An alert is reported at the start of
+its step, so 0 <= DES - stepped < dt for every sensor, unless the gap between
+the start of one of its detections and the next stimulus is within dt of
+waiting_window. Only there the timer and the stimulus can be ordered
+differently by the two engines, and that detection may be confirmed by one
+and cancelled by the other (the sensor is then Alerted at another time, or
+not at all).
+
+Only networks with the uniform transmission_delay and without a
+dissemination policy can be stepped, as the policies make the messages depend
+on the state.
+'''
+def run_stepped(network, epicenter, dt=0.01, duration=120, missed=None, false_triggers=None):
+    if network.link_delay is not None or network.policy is not None:
+        raise ValueError("The stepped engine needs a network with the uniform transmission_delay "
+                         "and without a dissemination policy")
+    lat, lon = network.topology.locations.T
+    n = len(lat)
+    arrival = plum.epicentral_distances(lat, lon, epicenter) / plum.P_WAVE_SPEED_KM_PER_S
+
+    # Own detections of the sensors (P-wave arrivals and false triggers)
+    hit = np.ones(n, dtype=bool) if missed is None else ~np.asarray(missed, dtype=bool)
+    detector = np.flatnonzero(hit)
+    detection_time = arrival[hit]
+    if false_triggers is not None:
+        false_triggers = np.asarray(false_triggers, dtype=float)
+        noisy = np.flatnonzero(~np.isnan(false_triggers))
+        detector = np.concatenate((detector, noisy))
+        detection_time = np.concatenate((detection_time, false_triggers[noisy]))
+
+    # Every detection is broadcast and reaches the neighbours transmission_delay later
+    indptr, indices, _ = network.index.adjacency(plum.TRANSMISSION_RANGE_KM)
+    degree = indptr[detector + 1] - indptr[detector]
+    first = np.repeat(indptr[detector] - (np.cumsum(degree) - degree), degree)
+    receiver = indices[first + np.arange(degree.sum())]
+    receive_time = np.repeat(detection_time + plum.transmission_delay, degree)
+
+    sensor = np.concatenate((detector, receiver))
+    stimulus_time = np.concatenate((detection_time, receive_time))
+    in_run = stimulus_time < duration
+    sensor, stimulus_time = sensor[in_run], stimulus_time[in_run]
+    step = np.floor(stimulus_time / dt).astype(np.int64)
+    # the stimulated sensors of every step, with their number of stimuli
+    keys, counts = np.unique(step * n + sensor, return_counts=True)
+    step, sensor = np.divmod(keys, n)
+    bounds = np.flatnonzero(np.diff(step)) + 1
+    groups = {}
+    if len(step):
+        groups = dict(zip(step[np.concatenate(([0], bounds))].tolist(),
+                          zip(np.split(sensor, bounds), np.split(counts, bounds))))
+
+    window = math.ceil(waiting_steps(dt))
+    status = np.full(n, OBSERVATION, dtype=np.int8)
+    started = np.full(n, -1, dtype=np.int64)
+    alert_step = np.full(n, -1, dtype=np.int64)
+    timers = {}
+    cancelled = 0
+    n_steps = math.ceil(duration / dt)
+    for s in range(n_steps):
+        ending = timers.pop(s, None)
+        if ending is not None:
+            ending = ending[(status[ending] == DETECTION) & (started[ending] == s - window)]
+            status[ending] = OBSERVATION
+            cancelled += len(ending)
+        group = groups.get(s)
+        if group is None:
+            continue
+        stimulated, counts = group
+        current = status[stimulated]
+        observing = current == OBSERVATION
+        confirmed = np.concatenate((stimulated[current == DETECTION],
+                                    stimulated[observing & (counts >= 2)]))
+        starting = stimulated[observing]
+        status[starting] = DETECTION
+        started[starting] = s
+        timers[s + window] = starting
+        status[confirmed] = ALERTED
+        alert_step[confirmed] = s
+
+    alert_time = np.where(alert_step >= 0, alert_step * dt, np.nan)
+    return SteppedResult(network.topology.ids, alert_time, status, cancelled,
+                         int(np.count_nonzero(receive_time < duration)), dt)
+
+
+# waiting_window in steps of dt, without the rounding error of the division
+def waiting_steps(dt):
+    steps = plum.waiting_window / dt
+    return round(steps) if math.isclose(steps, round(steps)) else steps
+
+
+'''
+Result of the stepped engine: alert_time of every sensor (the start of the
+step in which it was Alerted, NaN if never), its final status code,
+the number of detections cancelled by their timer and the messages delivered.
+'''
+class SteppedResult:
+    def __init__(self, sensor_ids, alert_time, status, cancelled, messages_delivered, dt):
+        self.sensor_ids = list(sensor_ids)
+        self.alert_time = alert_time
+        self.status = status
+        self.cancelled = cancelled
+        self.messages_delivered = messages_delivered
+        self.dt = dt
+
+    # Positions of the sensors Alerted at time t
+    def alerted_at(self, t):
+        return np.flatnonzero(self.alert_time <= t)
+
+
+'''
+Runs a scenario with the DES (run_scenario) and with the stepped engine on
+the same network and compares the alert time of every sensor. Returns a
+DataFrame with one row per sensor (des_alert_time, stepped_alert_time, their
+difference, and within_bound: both alert the sensor, or neither does, and
+0 <= difference < dt) and a dict summary with the wall times of both engines.
+'''
+def compare_with_des(network, epicenter, dt=0.01, duration=120, backend='simpy', seed=0):
+    start = time.perf_counter()
+    plum.run_scenario('compare', epicenter, network, duration, rng=random.Random(seed), backend=backend)
+    des_wall = time.perf_counter() - start
+    des = network.state.alerted_time.copy()
+
+    start = time.perf_counter()
+    stepped = run_stepped(network, epicenter, dt, duration).alert_time
+    stepped_wall = time.perf_counter() - start
+
+    difference = des - stepped
+    same_decision = np.isnan(des) == np.isnan(stepped)
+    tolerance = 1e-9 * max(1.0, duration)
+    within = same_decision & (np.isnan(des) | ((difference >= -tolerance) & (difference < dt + tolerance)))
+    sensors = pd.DataFrame({'sensor_id': network.topology.ids, 'des_alert_time': des,
+                            'stepped_alert_time': stepped, 'difference': difference,
+                            'within_bound': within})
+    summary = {'sensors': len(des), 'dt': dt,
+               'alerted_des': int(np.count_nonzero(~np.isnan(des))),
+               'alerted_stepped': int(np.count_nonzero(~np.isnan(stepped))),
+               'decision_mismatches': int(np.count_nonzero(~same_decision)),
+               'outside_bound': int(np.count_nonzero(~within)),
+               'max_abs_difference': float(np.max(np.abs(difference[~np.isnan(difference)]), initial=0.0)),
+               'des_wall_s': des_wall, 'stepped_wall_s': stepped_wall,
+               'speedup': des_wall / stepped_wall if stepped_wall > 0 else np.nan}
+    return sensors, summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the stepped engine with the DES")
+    parser.add_argument('--dt', type=float, default=0.01)
+    parser.add_argument('--duration', type=float, default=120)
+    parser.add_argument('--earthquakes', default='./data/earthquake.csv')
+    parser.add_argument('--sensors', default='./data/sensors.csv')
+    parser.add_argument('--synthetic', type=int, default=20000,
+                        help="sensors of the synthetic network, 0 to skip it")
+    parser.add_argument('--density', type=float, default=0.02, help="sensors per km^2")
+    parser.add_argument('--backend', default='heap')
+    parser.add_argument('--output', default=None, help="CSV of the per sensor differences")
+    args = parser.parse_args()
+
+    cases = [(args.sensors, plum.build_network(args.sensors), (earthquake.id, earthquake.latitude,
+                                                               earthquake.longitude))
+             for _, earthquake in pd.read_csv(args.earthquakes).iterrows()]
+    if args.synthetic:
+        centre = (-41.0, 175.0)
+        cases.append((f"synthetic_{args.synthetic}",
+                      synthetic_network(args.synthetic, args.density, centre=centre),
+                      ('centre', *centre)))
+    rows, frames = [], []
+    for name, network, (eq_id, latitude, longitude) in cases:
+        sensors, summary = compare_with_des(network, (latitude, longitude), args.dt,
+                                            args.duration, args.backend)
+        rows.append({'network': name, 'eq_id': eq_id, **summary})
+        frames.append(sensors.assign(network=name, eq_id=eq_id))
+    print(pd.DataFrame(rows).to_string(index=False))
+    if args.output:
+        pd.concat(frames, ignore_index=True).to_csv(args.output, index=False)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:49:16 2026
+"""
+
+import argparse
+import random
+import time
+import numpy as np
+import pandas as pd
+
+import plum_des_simulation as plum
+
+
+KINDS = ('peak', 'miss', 'false_trigger', 'false_time', 'gossip')
+
+# Constants of Philox4x32-10 (Salmon et al., Random123)
+PHILOX_M = (0xD2511F53, 0xCD9E8D57)
+PHILOX_W = (0x9E3779B9, 0xBB67AE85)
+MASK_32 = np.uint64(0xFFFFFFFF)
+
+
+'''
+Philox4x32-10 counter-based generator on arrays: the four 32-bit words of
+the counters and the two of the key are broadcast together and the four
+output words are returned, so any number of draws is one array computation.
+'''
+def philox4x32(counter, key):
+    c0, c1, c2, c3 = np.broadcast_arrays(*(np.asarray(word, dtype=np.uint64) for word in counter))
+    k0, k1 = (np.uint64(word) for word in key)
+    m0, m1 = np.uint64(PHILOX_M[0]), np.uint64(PHILOX_M[1])
+    for r in range(10):
+        if r:
+            k0 = (k0 + np.uint64(PHILOX_W[0])) & MASK_32
+            k1 = (k1 + np.uint64(PHILOX_W[1])) & MASK_32
+        p0 = m0 * c0
+        p1 = m1 * c2
+        c0, c1, c2, c3 = ((p1 >> np.uint64(32)) ^ c1 ^ k0, p1 & MASK_32,
+                          (p0 >> np.uint64(32)) ^ c3 ^ k1, p0 & MASK_32)
+    return c0, c1, c2, c3
+
+
+# Key of the streams of seed (an int)
+def stream_key(seed):
+    return tuple(int(word) for word in np.random.SeedSequence(seed).generate_state(2, np.uint32))
+
+
+'''
+Uniform [0, 1) values (53 bits) of the streams of key: the value of draw of
+sensor for kind in realisation. The arguments are integers or arrays which
+broadcast together, and each value only depends on them, e.g.
+uniforms(key, r[:, None], 'miss', np.arange(n), 0) gives the first miss draw
+of every sensor for a batch of realisations r.
+'''
+def uniforms(key, realisation, kind, sensor, draw):
+    words = philox4x32((realisation, KINDS.index(kind), sensor, draw), key)
+    return ((words[0] >> np.uint64(5)) * np.uint64(1 << 26) + (words[1] >> np.uint64(6))) / float(1 << 53)
+
+
+# Values of kind from the uniforms, the peaks are drawn like simulate_displacement
+def values(kind, u):
+    return np.round(0.1 + 9.9 * u, 2) if kind == 'peak' else u
+
+
+'''
+Random streams of one scenario (or Monte Carlo realisation), for results
+which do not depend on the order of the events, the backend, the number of
+workers or the size of the network.
+Every sensor has its own stream of every kind of draw (peak displacements,
+misses, false triggers, gossip), keyed by (seed, realisation, kind, sensor
+position): its k-th draw is a Philox value of that key and k, whatever the
+other sensors drew (see uniforms).
+The first batch draws of a kind are drawn for all the sensors at once on its
+first use, and a sensor which needs more gets a buffer of its own, which
+doubles when it runs out. So a draw in the run is a look-up in a list.
+prefill(kind, rows) gives the first draws computed in advance, e.g. by the
+batched draws of the Monte Carlo mode; they are the same values.
+
+Give them to run_scenario (streams=...) and the peak displacements come from
+the streams instead of the rng of the network. noise() gives the misses and
+false triggers of the scenario, as simulate_earthquake takes them.
+'''
+class ScenarioStreams:
+    KINDS = KINDS
+
+    def __init__(self, seed, n_sensors, batch=4, realisation=0):
+        self.seed = seed
+        self.key = stream_key(seed)
+        self.n_sensors = n_sensors
+        self.batch = batch
+        self.realisation = realisation
+        # first draws of all the sensors, as lists of rows of Python floats
+        self._rows = {}
+        # later draws, per sensor
+        self._more = {kind: {} for kind in KINDS}
+        self._drawn = {kind: [0] * n_sensors for kind in KINDS}
+
+    # The first len(rows) draws of kind of all the sensors, computed in advance
+    def prefill(self, kind, rows):
+        self._rows[kind] = np.asarray(rows).reshape(-1, self.n_sensors).tolist()
+
+    # Next value of kind for the sensor at position
+    def next(self, kind, position):
+        drawn = self._drawn[kind]
+        k = drawn[position]
+        drawn[position] = k + 1
+        rows = self._rows.get(kind)
+        if rows is None:
+            rows = self._rows[kind] = self.draw(kind, np.arange(self.n_sensors),
+                                                np.arange(self.batch)[:, None]).tolist()
+        if k < len(rows):
+            return rows[k][position]
+        more = self._more[kind].setdefault(position, [])
+        k -= len(rows)
+        if k >= len(more):
+            start = len(rows) + len(more)
+            more.extend(self.draw(kind, position, np.arange(start, start + max(self.batch, len(more)))).tolist())
+        return more[k]
+
+    # Next values of kind of all the sensors
+    def next_all(self, kind):
+        drawn = self._drawn[kind]
+        result = self.draw(kind, np.arange(self.n_sensors), np.array(drawn))
+        self._drawn[kind] = [k + 1 for k in drawn]
+        return result
+
+    # Values of kind of the sensors at the draws (arrays which broadcast)
+    def draw(self, kind, sensors, draws):
+        return values(kind, uniforms(self.key, self.realisation, kind, sensors, draws))
+
+    # Peak displacement (cm) of a new detection, as simulate_displacement
+    def peak(self, position):
+        return self.next('peak', position)
+
+    # Value in [0, 1) for the gossip of a sensor (see plum_dissemination)
+    def random(self, position):
+        return self.next('gossip', position)
+
+    # Misses and false trigger times (NaN for none) of all the sensors
+    def noise(self, miss_probability, false_detection_probability, duration):
+        missed = self.next_all('miss') < miss_probability
+        false = self.next_all('false_trigger') < false_detection_probability
+        false_time = self.next_all('false_time') * duration
+        return missed, np.where(false, false_time, np.nan)
+
+
+# Streams of realisation r of a Monte Carlo run with root seed seed. Any
+# shard can make the streams of its realisations without the others.
+def realisation_streams(seed, r, n_sensors, batch=4):
+    return ScenarioStreams(seed, n_sensors, batch, realisation=r)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the streams do not depend on the event order")
+    parser.add_argument('--earthquakes', default='./data/earthquake.csv')
+    parser.add_argument('--sensors', default='./data/sensors.csv')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--draws', type=int, default=100000)
+    args = parser.parse_args()
+
+    network = plum.build_network(args.sensors)
+    n = len(network.sensors)
+    rows = []
+    for _, earthquake in pd.read_csv(args.earthquakes).iterrows():
+        epicenter = (earthquake.latitude, earthquake.longitude)
+        logs = {backend: plum.run_scenario(earthquake.id, epicenter, network,
+                                           streams=ScenarioStreams(args.seed, n), backend=backend)
+                for backend in ('simpy', 'heap')}
+        rows.append({'eq_id': earthquake.id, 'rows': len(logs['simpy']),
+                     'backends_agree': logs['simpy'].equals(logs['heap'])})
+    print(pd.DataFrame(rows).to_string(index=False))
+
+    # The draws of each sensor do not depend on the order of the sensors
+    positions = np.random.default_rng(args.seed).integers(0, n, args.draws).tolist()
+    draws = []
+    for order in (positions, positions[::-1]):
+        streams = ScenarioStreams(args.seed, n)
+        per_sensor = {}
+        for position in order:
+            per_sensor.setdefault(position, []).append(streams.peak(position))
+        draws.append(per_sensor)
+    print("order independent:", draws[0] == draws[1])
+
+    start = time.perf_counter()
+    streams = ScenarioStreams(args.seed, n)
+    for position in positions:
+        streams.peak(position)
+    streams_wall = time.perf_counter() - start
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    for _ in range(args.draws):
+        plum.simulate_displacement(rng)
+    print(f"{args.draws} peak draws: streams {streams_wall:.3f}s, random {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:35:00 2026
+"""
+
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+import plum_des_simulation as plum
+from plum_kernel import BACKENDS
+from plum_loader import load_topology
+from plum_montecarlo import run_monte_carlo
+
+
+# The tuning constants of plum_des_simulation which can be swept
+PARAMETERS = ('TRANSMISSION_RANGE_KM', 'waiting_window', 'transmission_delay',
+              'P_WAVE_SPEED_KM_PER_S', 'miss_probability', 'false_detection_probability')
+
+
+'''
+Sets tuning constants of plum_des_simulation for the duration of the block
+and restores them afterwards:
+
+    with parameters(TRANSMISSION_RANGE_KM=20, waiting_window=3):
+        run_scenario(...)
+'''
+@contextmanager
+def parameters(**values):
+    check_parameters(values)
+    previous = {name: getattr(plum, name) for name in values}
+    try:
+        for name, value in values.items():
+            setattr(plum, name, value)
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(plum, name, value)
+
+
+def check_parameters(point):
+    unknown = sorted(set(point) - set(PARAMETERS))
+    if unknown:
+        raise ValueError(f"Unknown parameters {unknown}, expected some of {list(PARAMETERS)}")
+
+
+# Every combination of the values of grid (name -> list of values)
+def parameter_grid(grid):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+# n points drawn uniformly in bounds (name -> (low, high))
+def parameter_sample(n, bounds, seed=0):
+    rng = np.random.default_rng(seed)
+    draws = {name: rng.uniform(low, high, n) for name, (low, high) in bounds.items()}
+    return [{name: float(values[i]) for name, values in draws.items()} for i in range(n)]
+
+
+'''
+Parameter sweep over the tuning constants.
+Each point (a dict of PARAMETERS, e.g. from parameter_grid or
+parameter_sample) runs every earthquake of the catalogue through
+run_monte_carlo, with n_realisations realisations of the misses and false
+triggers. Every point uses the same seed, so the points are compared on the
+same random draws as far as their parameters allow.
+
+The work which does not depend on the parameters is done once: the sensor
+file is read and the topology built once, and the adjacency of the largest
+transmission range is built before the points are run. The adjacency of every
+smaller range is cut out of it (see NeighbourIndex.adjacency), so the whole
+sweep computes the sensor distances once. The topology is sent once to each
+worker of the pool, which builds its network from it and keeps it for all
+its points.
+
+The result is a tidy table with one row per point and earthquake: the
+parameters, then the summary of run_monte_carlo. first_arrival is the time at
+which the P-wave reaches the first sensor, and mean_alert_delay is the mean
+time from first_arrival to the first alert (mean_first_alert is counted from
+the origin time).
+'''
+def run_sweep(points, earthquakes, sensors_file='./data/sensors.csv', n_realisations=1, seed=0,
+              workers=None, duration=120, backend='simpy'):
+    for point in points:
+        check_parameters(point)
+    topology = load_topology(sensors_file, cell_km=plum.TRANSMISSION_RANGE_KM)
+    ranges = [point.get('TRANSMISSION_RANGE_KM', plum.TRANSMISSION_RANGE_KM) for point in points]
+    topology.index.adjacency(max(ranges, default=plum.TRANSMISSION_RANGE_KM))
+
+    catalogue = [(earthquake.id, (earthquake.latitude, earthquake.longitude))
+                 for _, earthquake in earthquakes.iterrows()]
+    tasks = [(index, point, catalogue, n_realisations, seed, duration, backend)
+             for index, point in enumerate(points)]
+    if workers == 1:
+        _init_worker(topology)
+        rows = list(map(run_point, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(topology,)) as pool:
+            rows = list(pool.map(run_point, tasks))
+    return pd.DataFrame([row for point_rows in rows for row in point_rows])
+
+
+# The network of this process, built from the topology of the sweep
+_network = None
+
+
+def _init_worker(topology):
+    global _network
+    sensor_list = plum.sensors_from_arrays(None, topology.ids, *topology.locations.T.tolist())
+    _network = plum.connect_network(sensor_list, topology=topology)
+
+
+# Runs the catalogue for one point of the sweep
+def run_point(task):
+    index, point, catalogue, n_realisations, seed, duration, backend = task
+    rows = []
+    with parameters(**point):
+        _network.initialize_known_sensors()  # the range may have changed
+        lat, lon = _network.topology.locations.T
+        for eq_id, epicenter in catalogue:
+            result = run_monte_carlo(_network, epicenter, n_realisations, seed,
+                                     duration=duration, backend=backend)
+            summary = result.summary()
+            first_arrival = np.min(plum.epicentral_distances(lat, lon, epicenter)) / plum.P_WAVE_SPEED_KM_PER_S
+            rows.append({'point': index, **point, 'eq_id': eq_id, **summary,
+                         'first_arrival': first_arrival,
+                         'mean_alert_delay': summary['mean_first_alert'] - first_arrival})
+    return rows
+
+
+# NAME=V1,V2,... (grid values) or NAME=LOW:HIGH (sample bounds)
+def parse_parameter(text):
+    name, _, values = text.partition('=')
+    if ':' in values:
+        low, high = values.split(':')
+        return name, (float(low), float(high))
+    return name, [float(value) for value in values.split(',')]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep the PLUM tuning constants")
+    parser.add_argument('parameters', nargs='+', metavar='NAME=VALUES',
+                        help="NAME=V1,V2,... for a grid, or NAME=LOW:HIGH with --sample; "
+                             f"NAME is one of {', '.join(PARAMETERS)}")
+    parser.add_argument('--sample', type=int, default=None,
+                        help="draw this many points in the LOW:HIGH bounds instead of a grid")
+    parser.add_argument('--earthquakes', default='./data/earthquake.csv')
+    parser.add_argument('--sensors', default='./data/sensors.csv')
+    parser.add_argument('--realisations', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--duration', type=float, default=120)
+    parser.add_argument('--backend', default='simpy', choices=sorted(BACKENDS))
+    parser.add_argument('--output', default='./outputs/sweep.csv')
+    args = parser.parse_args()
+
+    values = dict(map(parse_parameter, args.parameters))
+    if args.sample is not None:
+        points = parameter_sample(args.sample, values, args.seed)
+    else:
+        points = parameter_grid(values)
+    results = run_sweep(points, pd.read_csv(args.earthquakes), args.sensors, args.realisations,
+                        args.seed, args.workers, args.duration, args.backend)
+    results.to_csv(args.output, index=False)
+    print(results.to_string(index=False))
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:28:40 2026
+"""
+
+import argparse
+import math
+import numpy as np
+import pandas as pd
+
+import plum_des_simulation as plum
+
+
+# (lat_min, lat_max, lon_min, lon_max) of New Zealand
+NZ_BBOX = (-47.5, -34.0, 166.0, 179.0)
+KM_PER_DEGREE: float = 111.19
+
+
+'''
+Synthetic sensor networks, for benchmarks and for checking the simulation on
+more than the 27 bundled sensors.
+The n sensors are spread uniformly in bbox. With a density (sensors per km^2)
+they are spread in a square of n / density km^2 around centre instead (the
+centre of bbox by default), so the number of neighbours of a sensor in range
+is about density * pi * TRANSMISSION_RANGE_KM^2 whatever n is. The square is
+not clipped to bbox, which would make the density higher than asked: at
+10^5 sensors and 0.01 sensors/km^2 it is larger than New Zealand, and
+crosses the antimeridian: the longitudes are wrapped into [-180, 180).
+'''
+def synthetic_locations(n, density=None, bbox=NZ_BBOX, centre=None, seed=0):
+    rng = np.random.default_rng(seed)
+    lat_min, lat_max, lon_min, lon_max = bbox
+    if density is not None:
+        if centre is None:
+            centre = ((lat_min + lat_max) / 2, (lon_min + lon_max) / 2)
+        half_lat = math.sqrt(n / density) / KM_PER_DEGREE / 2
+        half_lon = half_lat / math.cos(math.radians(centre[0]))
+        lat_min, lat_max = centre[0] - half_lat, centre[0] + half_lat
+        lon_min, lon_max = centre[1] - half_lon, centre[1] + half_lon
+        if lat_min < -90 or lat_max > 90 or half_lon > 180:
+            raise ValueError(f"{n} sensors at {density:g} sensors/km^2 do not fit around {centre}")
+    # uniform on the sphere: sin(lat) is uniform
+    lat = np.degrees(np.arcsin(rng.uniform(np.sin(np.radians(lat_min)), np.sin(np.radians(lat_max)), n)))
+    lon = (rng.uniform(lon_min, lon_max, n) + 180) % 360 - 180
+    return lat, lon
+
+
+# Synthetic sensors in the layout of sensors.csv
+def synthetic_sensors(n, density=None, bbox=NZ_BBOX, centre=None, seed=0):
+    lat, lon = synthetic_locations(n, density, bbox, centre, seed)
+    width = max(2, len(str(n)))
+    return pd.DataFrame({'id': [f"S{i + 1:0{width}d}" for i in range(n)],
+                         'longitude': lon, 'latitude': lat, 'altitude': 0})
+
+
+# A Network of synthetic sensors, kwargs go to Network
+def synthetic_network(n, density=None, bbox=NZ_BBOX, centre=None, seed=0, **kwargs):
+    sensors = synthetic_sensors(n, density, bbox, centre, seed)
+    sensor_list = plum.sensors_from_arrays(None, sensors.id.tolist(), sensors.latitude.tolist(),
+                                           sensors.longitude.tolist())
+    return plum.connect_network(sensor_list, **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic sensors.csv")
+    parser.add_argument('n', type=int)
+    parser.add_argument('--density', type=float, default=None, help="sensors per km^2")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='./data/synthetic_sensors.csv')
+    args = parser.parse_args()
+    synthetic_sensors(args.n, args.density, seed=args.seed).to_csv(args.output, index=False)
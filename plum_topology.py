@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:19:34 2026
+"""
+
+import math
+from collections.abc import Mapping
+import numpy as np
+from plum_geodesy import EARTH_RADIUS_KM, haversine_km
+
+
+'''
+The immutable part of a sensor network: the IDs, the coordinates and the
+neighbour index (adjacency and distances). It is built once and shared by all
+the scenarios which run on the network, while the state of a run (status,
+detections, peaks, ...) lives in the SensorState of the network (see
+plum_state) and is reset between scenarios.
+'''
+class Topology:
+    def __init__(self, ids, locations, cell_km=30):
+        self.ids = list(ids)
+        self.positions = {sensor_id: i for i, sensor_id in enumerate(self.ids)}
+        if len(self.positions) != len(self.ids):
+            raise ValueError("Sensor IDs of a topology must be unique")
+        self.locations = np.asarray(locations, dtype=float).reshape(-1, 2)
+        self.index = NeighbourIndex(self.locations, cell_km)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+'''
+Neighbour index of the sensor network.
+Each sensor is placed on the unit sphere as an (x, y, z) point and binned in a
+uniform 3D grid. The straight-line (chord) distance between two points on the
+sphere grows monotonically with the great-circle distance, so every sensor
+within range_km of a sensor lies in the grid cells covering the chord of
+range_km around it. Only those candidates are checked with haversine.
+The distances of the pairs in range are kept next to the adjacency, so the
+index also holds the sparse sensor to sensor distance matrix.
+
+The grid does not depend on the transmission range. Neighbour lists are built
+once per range and cached, so changing TRANSMISSION_RANGE_KM between runs only
+costs one extra build and never a new grid. A range below one already built is
+not built again but cut out of the larger one (its distances are kept), so
+building the largest range of a sweep first gives all the others for free.
+'''
+class NeighbourIndex:
+    def __init__(self, locations, cell_km=30):
+        locations = np.asarray(locations, dtype=float).reshape(-1, 2)
+        self.lat = locations[:, 0]
+        self.lon = locations[:, 1]
+        self.size = len(locations)
+        self.cell_km = cell_km
+        self.cell_size = chord_length(cell_km)
+
+        lat_rad = np.radians(self.lat)
+        lon_rad = np.radians(self.lon)
+        self.xyz = np.column_stack((np.cos(lat_rad) * np.cos(lon_rad),
+                                    np.cos(lat_rad) * np.sin(lon_rad),
+                                    np.sin(lat_rad)))
+        keys = np.floor(self.xyz / self.cell_size).astype(np.int64)
+        self.cells = {}
+        for i, key in enumerate(map(tuple, keys)):
+            self.cells.setdefault(key, []).append(i)
+        self.cells = {key: np.array(members) for key, members in self.cells.items()}
+        self._neighbours = {}
+
+    # Returns the indices of the sensors within range_km of sensor i, in
+    # ascending order (the order of the sensor list).
+    def neighbours(self, i, range_km):
+        indptr, indices, _ = self.adjacency(range_km)
+        return indices[indptr[i]:indptr[i + 1]]
+
+    # Distances (km) to the neighbours of sensor i, aligned with neighbours()
+    def neighbour_distances(self, i, range_km):
+        indptr, _, distances = self.adjacency(range_km)
+        return distances[indptr[i]:indptr[i + 1]]
+
+    # The CSR adjacency (indptr, indices, distances) of the network for range_km
+    def adjacency(self, range_km):
+        if range_km not in self._neighbours:
+            larger = [r for r in self._neighbours if r > range_km]
+            if larger:
+                self._neighbours[range_km] = self._restrict(self._neighbours[min(larger)], range_km)
+            else:
+                self._neighbours[range_km] = self._build(range_km)
+        return self._neighbours[range_km]
+
+    # The adjacency for range_km from the adjacency of a larger range
+    @staticmethod
+    def _restrict(adjacency, range_km):
+        indptr, indices, distances = adjacency
+        keep = distances <= range_km
+        kept = np.concatenate(([0], np.cumsum(keep)))
+        return kept[indptr], indices[keep], distances[keep]
+
+    def _build(self, range_km):
+        reach = max(1, math.ceil(chord_length(range_km) / self.cell_size))
+        offsets = [(dx, dy, dz)
+                   for dx in range(-reach, reach + 1)
+                   for dy in range(-reach, reach + 1)
+                   for dz in range(-reach, reach + 1)]
+        rows = [None] * self.size
+        row_distances = [None] * self.size
+        for (cx, cy, cz), members in self.cells.items():
+            candidates = [self.cells[cell] for cell in
+                          ((cx + dx, cy + dy, cz + dz) for dx, dy, dz in offsets)
+                          if cell in self.cells]
+            candidates = np.sort(np.concatenate(candidates))
+            dist = haversine_km(self.lat[members, None], self.lon[members, None],
+                                self.lat[candidates], self.lon[candidates])
+            in_range = (dist <= range_km) & (members[:, None] != candidates)
+            for row, i in enumerate(members):
+                rows[i] = candidates[in_range[row]]
+                row_distances[i] = dist[row][in_range[row]]
+
+        indptr = np.zeros(self.size + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(row) for row in rows])
+        if not self.size:
+            return indptr, np.empty(0, dtype=np.int64), np.empty(0)
+        return indptr, np.concatenate(rows), np.concatenate(row_distances)
+
+
+'''
+Shared columnar store behind the known_sensors of every sensor.
+There is one array per field (location, P_Value and S_Value) indexed by the
+position of the sensor in the network, plus the CSR adjacency of the sensors
+in range. A sensor only sees its own neighbours through a KnownSensorsView,
+so the memory grows with N * degree instead of N^2.
+P_Value and S_Value are NaN until they are known.
+'''
+class KnownSensorStore:
+    def __init__(self, ids, locations, indptr, indices):
+        self.ids = list(ids)
+        self.location = np.asarray(locations, dtype=float).reshape(-1, 2)
+        self.P_Value = np.full(len(self.ids), np.nan)
+        self.S_Value = np.full(len(self.ids), np.nan)
+        self.indptr = indptr
+        self.indices = indices
+        self.positions = {sensor_id: i for i, sensor_id in enumerate(self.ids)}
+
+    def view(self, i):
+        return KnownSensorsView(self, i)
+
+    # Forgets the values of the previous run
+    def reset(self):
+        self.P_Value.fill(np.nan)
+        self.S_Value.fill(np.nan)
+
+
+# Read-only mapping of neighbour ID -> KnownSensor, like the old dict of dicts
+class KnownSensorsView(Mapping):
+    __slots__ = ('store', 'owner')
+
+    def __init__(self, store, owner):
+        self.store = store
+        self.owner = owner
+
+    def _neighbours(self):
+        return self.store.indices[self.store.indptr[self.owner]:self.store.indptr[self.owner + 1]]
+
+    def __getitem__(self, sensor_id):
+        j = self.store.positions.get(sensor_id)
+        neighbours = self._neighbours()
+        k = np.searchsorted(neighbours, j) if j is not None else len(neighbours)
+        if k == len(neighbours) or neighbours[k] != j:
+            raise KeyError(sensor_id)
+        return KnownSensor(self.store, j)
+
+    def __iter__(self):
+        return (self.store.ids[j] for j in self._neighbours())
+
+    def __len__(self):
+        return len(self._neighbours())
+
+
+# One row of the store, read and written with the old dict keys
+class KnownSensor:
+    __slots__ = ('store', 'position')
+
+    def __init__(self, store, position):
+        self.store = store
+        self.position = position
+
+    def __getitem__(self, field):
+        if field == 'location':
+            return tuple(self.store.location[self.position].tolist())
+        value = getattr(self.store, field)[self.position]
+        return None if np.isnan(value) else float(value)
+
+    def __setitem__(self, field, value):
+        if field not in ('P_Value', 'S_Value'):
+            raise KeyError(field)
+        getattr(self.store, field)[self.position] = np.nan if value is None else value
+
+
+# Length of the chord (on the unit sphere) of a great-circle distance in km
+def chord_length(distance_km):
+    return 2 * math.sin(min(distance_km / (2 * EARTH_RADIUS_KM), math.pi / 2))
+
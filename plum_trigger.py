@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:46:35 2026
+"""
+
+import argparse
+import math
+import random
+import numpy as np
+import pandas as pd
+
+import plum_des_simulation as plum
+from plum_waveforms import WaveformSource, write_synthetic_records
+
+
+'''
+STA/LTA trigger of the P-wave detections, picked from the waveform records
+(see plum_waveforms) instead of distance / P_WAVE_SPEED_KM_PER_S.
+The records of all the sensors are read in chunks of chunk_samples samples,
+as one (sensors x samples) array, so the memory is bounded by the chunk and
+not by the length of the records. On each chunk:
+
+- the characteristic function is the squared samples,
+- the short and long term averages are recursive (exponential) averages of
+  sta and lta seconds, their state is carried from chunk to chunk,
+- a sensor triggers when sta / lta goes above on and is armed again when it
+  goes below off. The first lta seconds after start are not used (the LTA
+  is still warming up).
+
+Everything is done for all the sensors at once with array operations, the
+recursion of the averages included (see recursive_average). Every trigger is
+a pick: the noise of the records gives the false triggers, and the time the
+ratio takes to go above on gives the detection latency.
+picks() returns the picks as (sensor positions, simulation times), sorted by
+time, to give to run_scenario(picks=...).
+'''
+class TriggerPipeline:
+    def __init__(self, source, sensor_ids, sta=0.5, lta=10.0, on=4.0, off=1.5,
+                 chunk_samples=None, max_chunk_bytes=64 * 2 ** 20):
+        self.source = source
+        self.sensor_ids = list(sensor_ids)
+        self.sta = sta
+        self.lta = lta
+        self.on = on
+        self.off = off
+        if chunk_samples is None:
+            # the chunk, its squares and the two averages
+            chunk_samples = max(1, max_chunk_bytes // (32 * max(1, len(self.sensor_ids))))
+        self.chunk_samples = chunk_samples
+
+    # Picks of the sensors in the simulation times [start, end)
+    def picks(self, start=0.0, end=120.0):
+        source = self.source
+        first = max(0, math.floor(source.sample(start)))
+        last = math.ceil(source.sample(end))
+        c_sta = 1 / max(1.0, self.sta * source.sampling_rate)
+        c_lta = 1 / max(1.0, self.lta * source.sampling_rate)
+        warm_up = math.ceil(self.lta * source.sampling_rate)
+        n = len(self.sensor_ids)
+        sta, lta = np.zeros(n), np.zeros(n)
+        triggered = np.zeros(n, dtype=bool)
+        positions, samples = [], []
+        for chunk_start in range(first, last, self.chunk_samples):
+            chunk_end = min(last, chunk_start + self.chunk_samples)
+            energy = self.read_chunk(chunk_start, chunk_end) ** 2
+            short, sta = recursive_average(energy, c_sta, sta)
+            long, lta = recursive_average(energy, c_lta, lta)
+            ratio = np.divide(short, long, out=np.zeros_like(short), where=long > 0)
+            # the LTA warms up from the first sample read
+            ratio[:, :max(0, first + warm_up - chunk_start)] = 0
+            state = hysteresis(ratio, self.on, self.off, triggered)
+            started = state & ~np.concatenate((triggered[:, None], state[:, :-1]), axis=1)
+            triggered = state[:, -1]
+            rows, columns = np.nonzero(started)
+            positions.append(rows)
+            samples.append(chunk_start + columns)
+        positions = np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+        times = source.time(np.concatenate(samples)) if samples else np.empty(0)
+        order = np.argsort(times, kind='stable')
+        return positions[order], times[order]
+
+    # The samples [start, end) of all the records, 0 where a record has none
+    def read_chunk(self, start, end):
+        chunk = np.zeros((len(self.sensor_ids), end - start))
+        for row, sensor_id in enumerate(self.sensor_ids):
+            record = self.source.record(sensor_id)
+            if record is None or start >= len(record):
+                continue
+            samples = record[start:end]
+            chunk[row, :len(samples)] = samples
+        return chunk
+
+
+'''
+Recursive average y[k] = (1 - c) * y[k - 1] + c * x[k] along the rows of x,
+from the averages state before the first column. Returns the averages and
+the new state. The recursion is solved in closed form with cumulative sums,
+y[k] = (1 - c)^k * (y[0] + c * sum_j (1 - c)^-j x[j]), over blocks short
+enough for (1 - c)^-k to stay small, so all the rows and the samples of a
+block are done at once.
+'''
+def recursive_average(x, c, state):
+    decay = 1 - c
+    block = x.shape[1] if decay <= 0 or decay >= 1 else max(1, int(20 / -math.log(decay)))
+    out = np.empty_like(x)
+    for start in range(0, x.shape[1], block):
+        part = x[:, start:start + block]
+        k = np.arange(1, part.shape[1] + 1)
+        if decay <= 0:
+            out[:, start:start + part.shape[1]] = c * part
+        else:
+            sums = np.cumsum(part * decay ** -k, axis=1)
+            out[:, start:start + part.shape[1]] = decay ** k * (state[:, None] + c * sums)
+        state = out[:, start + part.shape[1] - 1]
+    return out, state.copy()
+
+
+# On/off state of the trigger at every sample: on above on until below off
+def hysteresis(ratio, on, off, initial):
+    index = np.arange(ratio.shape[1])
+    last_on = np.maximum.accumulate(np.where(ratio > on, index, -1), axis=1)
+    last_off = np.maximum.accumulate(np.where(ratio < off, index, -1), axis=1)
+    return np.where((last_on < 0) & (last_off < 0), initial[:, None], last_on > last_off)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the scenarios with STA/LTA picks of the records")
+    parser.add_argument('directory', help="directory of the <sensor_id>.npy/.bin records")
+    parser.add_argument('--earthquakes', default='./data/earthquake.csv')
+    parser.add_argument('--sensors', default='./data/sensors.csv')
+    parser.add_argument('--sampling-rate', type=float, default=100.0)
+    parser.add_argument('--sta', type=float, default=0.5)
+    parser.add_argument('--lta', type=float, default=10.0)
+    parser.add_argument('--on', type=float, default=4.0)
+    parser.add_argument('--off', type=float, default=1.5)
+    parser.add_argument('--duration', type=float, default=120)
+    parser.add_argument('--synthetic', action='store_true',
+                        help="first write synthetic records of the first earthquake to directory")
+    args = parser.parse_args()
+
+    earthquakes = pd.read_csv(args.earthquakes)
+    waveforms = WaveformSource(args.directory, args.sampling_rate)
+    network = plum.build_network(args.sensors, waveforms=waveforms)
+    if args.synthetic:
+        first = earthquakes.iloc[0]
+        write_synthetic_records(args.directory, network.topology, (first.latitude, first.longitude),
+                                duration=args.duration, sampling_rate=args.sampling_rate)
+    pipeline = TriggerPipeline(waveforms, network.topology.ids, args.sta, args.lta, args.on, args.off)
+    positions, times = pipeline.picks(0, args.duration)
+    lat, lon = network.topology.locations.T
+    for _, earthquake in earthquakes.iterrows():
+        epicenter = (earthquake.latitude, earthquake.longitude)
+        arrival = plum.epicentral_distances(lat, lon, epicenter) / plum.P_WAVE_SPEED_KM_PER_S
+        picks = pd.DataFrame({'sensor_id': np.array(network.topology.ids)[positions],
+                              'pick_time': times, 'p_arrival': arrival[positions]})
+        picks['latency'] = picks.pick_time - picks.p_arrival
+        print(picks.to_string(index=False))
+        log = plum.run_scenario(earthquake.id, epicenter, network, args.duration,
+                                rng=random.Random(0), picks=(positions, times))
+        alerts = log[log.action == 'ChangeStatus']
+        print(f"{earthquake.id}: {len(picks)} picks, {alerts.sensor_id.nunique()} sensors alerted, "
+              f"first alert at {alerts.time.min():.3f}s")
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:44:27 2026
+"""
+
+import argparse
+import math
+import os
+import random
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+import plum_des_simulation as plum
+from plum_geodesy import epicentral_distances
+
+
+'''
+Waveform source of the peak displacements.
+Each sensor has one continuous displacement record (cm) in directory, either
+<sensor_id>.npy or a raw <sensor_id>.bin of dtype samples, sampled at
+sampling_rate Hz. Sample 0 is at start_time and origin_time is the origin
+time of the scenario, both in seconds on the same clock (with the defaults
+the records start at the origin time), so the simulation time t is at
+origin_time + t on the records.
+
+The records are memory-mapped, nothing is read when a record is opened. At a
+detection at time t only the samples of the window from t - pre_window to
+t + window are read: the peak displacement is the largest absolute value of
+the window after t, with the mean of the pre_window samples (the noise before
+the arrival) removed when pre_window > 0. So a multi-GB record costs a few
+pages per detection. At most max_open records are kept mapped, the least
+recently used are closed, so the number of open files stays bounded.
+peak() returns None when a sensor has no record or the window is outside it.
+
+Give it to the Network (waveforms=...) and Sensor.detect_p_wave takes its
+P_peak from the records instead of the rng.
+'''
+class WaveformSource:
+    def __init__(self, directory, sampling_rate=100.0, start_time=0.0, origin_time=0.0,
+                 window=3.0, pre_window=0.0, dtype='float32', max_open=1024):
+        self.directory = directory
+        self.sampling_rate = sampling_rate
+        self.start_time = start_time
+        self.origin_time = origin_time
+        self.window = window
+        self.pre_window = pre_window
+        self.dtype = np.dtype(dtype)
+        self.max_open = max_open
+        self._records = OrderedDict()
+
+    # The memory-mapped record of sensor_id, None if it has none
+    def record(self, sensor_id):
+        records = self._records
+        if sensor_id in records:
+            records.move_to_end(sensor_id)
+            return records[sensor_id]
+        path = os.path.join(self.directory, f"{sensor_id}.npy")
+        if os.path.exists(path):
+            record = np.load(path, mmap_mode='r')
+        elif os.path.exists(path[:-4] + '.bin'):
+            record = np.memmap(path[:-4] + '.bin', dtype=self.dtype, mode='r')
+        else:
+            record = None
+        records[sensor_id] = record
+        if len(records) > self.max_open:
+            records.popitem(last=False)
+        return record
+
+    # Sample of the records at simulation time t
+    def sample(self, t):
+        return (self.origin_time + t - self.start_time) * self.sampling_rate
+
+    # Simulation time of sample (the inverse of sample)
+    def time(self, sample):
+        return self.start_time + sample / self.sampling_rate - self.origin_time
+
+    # Peak displacement (cm) of sensor_id for a detection at simulation time t
+    def peak(self, sensor_id, t):
+        record = self.record(sensor_id)
+        if record is None:
+            return None
+        arrival = self.sample(t)
+        first = max(0, math.floor(arrival - self.pre_window * self.sampling_rate))
+        start = max(0, math.floor(arrival))
+        end = min(len(record), math.ceil(arrival + self.window * self.sampling_rate) + 1)
+        if start >= end:
+            return None
+        samples = np.asarray(record[first:end], dtype=float)
+        baseline = samples[:start - first].mean() if start > first else 0.0
+        return float(np.max(np.abs(samples[start - first:] - baseline)))
+
+    def close(self):
+        self._records.clear()
+
+
+'''
+Writes synthetic records of the sensors of a topology for an earthquake at
+epicenter (at the origin time, sample 0), for checking the waveform source:
+noise everywhere, and from the P arrival a decaying oscillation whose
+amplitude falls with the distance. Returns the peak amplitudes of the P
+pulses (cm).
+'''
+def write_synthetic_records(directory, topology, epicenter, duration=120, sampling_rate=100.0,
+                            p_wave_speed=6, noise=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    lat, lon = topology.locations.T
+    distances = epicentral_distances(lat, lon, epicenter)
+    amplitudes = np.round(rng.uniform(0.1, 10.0, len(distances)) * 30 / np.maximum(distances, 30), 2)
+    t = np.arange(int(duration * sampling_rate)) / sampling_rate
+    for sensor_id, distance, amplitude in zip(topology.ids, distances, amplitudes):
+        record = rng.normal(0, noise, len(t))
+        after = t >= distance / p_wave_speed
+        lag = t[after] - distance / p_wave_speed
+        record[after] += amplitude * np.exp(-lag) * np.cos(2 * np.pi * 2 * lag)
+        np.save(os.path.join(directory, f"{sensor_id}.npy"), record.astype(np.float32))
+    return amplitudes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the scenarios with peaks from waveform records")
+    parser.add_argument('directory', help="directory of the <sensor_id>.npy/.bin records")
+    parser.add_argument('--earthquakes', default='./data/earthquake.csv')
+    parser.add_argument('--sensors', default='./data/sensors.csv')
+    parser.add_argument('--sampling-rate', type=float, default=100.0)
+    parser.add_argument('--window', type=float, default=3.0)
+    parser.add_argument('--synthetic', action='store_true',
+                        help="first write synthetic records of the first earthquake to directory")
+    args = parser.parse_args()
+
+    earthquakes = pd.read_csv(args.earthquakes)
+    waveforms = WaveformSource(args.directory, args.sampling_rate, window=args.window)
+    network = plum.build_network(args.sensors, waveforms=waveforms)
+    if args.synthetic:
+        first = earthquakes.iloc[0]
+        write_synthetic_records(args.directory, network.topology, (first.latitude, first.longitude),
+                                sampling_rate=args.sampling_rate)
+    for _, earthquake in earthquakes.iterrows():
+        log = plum.run_scenario(earthquake.id, (earthquake.latitude, earthquake.longitude), network,
+                                rng=random.Random(0))
+        produced = log[(log.action == 'Produce') & log.value.notna()]
+        print(produced[['time', 'sensor_id', 'status', 'value']].to_string(index=False))
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:57:17 2026
+"""
+
+import os
+import sys
+
+import pytest
+
+# The plum_* modules are at the top of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SENSORS = os.path.join(ROOT, 'data', 'sensors.csv')
+EARTHQUAKES = os.path.join(ROOT, 'data', 'earthquake.csv')
+
+
+@pytest.fixture(scope='session')
+def earthquakes():
+    import pandas as pd
+    return pd.read_csv(EARTHQUAKES)
+
+
+@pytest.fixture
+def network():
+    import plum_des_simulation as plum
+    return plum.build_network(SENSORS)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:00:38 2026
+"""
+
+import random
+
+import pandas as pd
+import pytest
+
+import plum_des_simulation as plum
+import plum_runner
+from conftest import SENSORS
+from plum_kernel import BACKENDS
+
+
+@pytest.fixture(scope='module')
+def reference(earthquakes):
+    return plum_runner.run_scenarios(earthquakes, SENSORS, workers=1, backend='simpy')
+
+
+# Every backend gives the same log as SimPy for the bundled sensors and earthquakes
+@pytest.mark.parametrize('backend', sorted(set(BACKENDS) - {'simpy'}))
+def test_backend_matches_simpy(earthquakes, reference, backend):
+    log = plum_runner.run_scenarios(earthquakes, SENSORS, workers=1, backend=backend)
+    assert len(reference) > 0
+    pd.testing.assert_frame_equal(log, reference)
+
+
+def test_compare_backends(earthquakes, reference):
+    assert plum_runner.compare_backends(earthquakes, SENSORS) == len(reference)
+
+
+# Unicast delivery runs SimPy processes, other backends are refused up front
+@pytest.mark.parametrize('backend', sorted(set(BACKENDS) - {'simpy'}))
+def test_unicast_needs_simpy(network, earthquakes, backend):
+    first = earthquakes.iloc[0]
+    epicenter = (first.latitude, first.longitude)
+    network.multicast = False
+    unicast = plum.run_scenario(first.id, epicenter, network, rng=random.Random(0), backend='simpy')
+    with pytest.raises(ValueError, match='simpy'):
+        plum.run_scenario(first.id, epicenter, network, backend=backend)
+    network.multicast = True
+    multicast = plum.run_scenario(first.id, epicenter, network, rng=random.Random(0), backend='simpy')
+    pd.testing.assert_frame_equal(unicast, multicast)
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:59:51 2026
+"""
+
+from plum_dissemination import compare_policies, make_policy
+
+
+def test_policies_suppress_rebroadcasts_with_noise(network, earthquakes):
+    results = compare_policies(network, earthquakes, [make_policy('suppress'), make_policy('rate:10')],
+                               realisations=10).set_index('policy')
+    assert results.loc['flood', 'messages_suppressed'] == 0
+    for policy in ('suppress', 'rate:10'):
+        assert results.loc[policy, 'messages_suppressed'] > 0
+        assert results.loc[policy, 'messages_delivered'] < results.loc['flood', 'messages_delivered']
+
+
+# Suppressed rebroadcasts can leave sensors unalerted, which is reported
+def test_coverage_loss_is_reported(network, earthquakes):
+    results = compare_policies(network, earthquakes, [make_policy('gossip:0.5')],
+                               realisations=10).set_index('policy')
+    assert results.loc['flood', 'coverage_loss'] == 0
+    assert results.loc['gossip:0.5', 'coverage_loss'] == (results.loc['flood', 'n_alerted']
+                                                          - results.loc['gossip:0.5', 'n_alerted'])
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:00:38 2026
+"""
+
+from plum_geodesy import check_accuracy
+
+
+def test_vectorised_distances_match_calculate_distance():
+    assert check_accuracy(n_pairs=20000) <= 1e-9
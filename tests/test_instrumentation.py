@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:58:47 2026
+"""
+
+import random
+
+import pytest
+
+import plum_des_simulation as plum
+from conftest import SENSORS
+from plum_instrumentation import Instrumentation
+
+
+def failing_link_delay(distances):
+    raise RuntimeError("link down")
+
+
+@pytest.mark.parametrize('backend', ['simpy', 'heap'])
+def test_sensor_methods_are_restored_after_a_failed_run(earthquakes, backend):
+    receive, detect_p_wave = plum.Sensor.receive, plum.Sensor.detect_p_wave
+    # the first broadcast of the run fails
+    network = plum.build_network(SENSORS, link_delay=failing_link_delay)
+    first = earthquakes.iloc[0]
+    with pytest.raises(RuntimeError, match='link down'):
+        plum.run_scenario(first.id, (first.latitude, first.longitude), network, backend=backend,
+                          instrumentation=Instrumentation())
+    assert plum.Sensor.receive is receive
+    assert plum.Sensor.detect_p_wave is detect_p_wave
+    assert 'broadcast' not in vars(network) and 'log_event' not in vars(network.log)
+
+
+# The report of a scenario only counts that scenario
+def test_report_is_per_scenario(earthquakes):
+    network = plum.build_network(SENSORS)
+    first = earthquakes.iloc[0]
+    instrumentation = Instrumentation()
+    reports = []
+    for _ in range(2):
+        plum.run_scenario(first.id, (first.latitude, first.longitude), network, rng=random.Random(0),
+                          instrumentation=instrumentation)
+        reports.append((instrumentation.report().calls, len(instrumentation.samples)))
+    assert reports[0][0]['broadcast'] > 0
+    assert reports[0][0].equals(reports[1][0])
+    assert reports[0][1] == reports[1][1]
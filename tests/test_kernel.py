@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:19:28 2026
+"""
+
+import pytest
+
+from plum_kernel import BACKENDS, make_kernel
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def env(request):
+    return make_kernel(request.param)
+
+
+def test_cancelled_timers_are_not_called(env):
+    calls = []
+    timers = [env.call_later(delay, calls.append, delay) for delay in (1, 2, 3)]
+    env.cancel(timers[1])
+    env.cancel(timers[1])
+    assert env.queue_size == 2 and env.cancelled == 1
+    env.run()
+    assert calls == [1, 3]
+    assert env.queue_size == 0
+    # a called timer cannot be cancelled any more
+    env.cancel(timers[0])
+    assert env.cancelled == 1
+
+
+def test_rearm_moves_the_call(env):
+    calls = []
+    timer = env.call_later(1, lambda: calls.append(env.now))
+    env.call_later(2, lambda: calls.append('other'))
+    timer = env.rearm(timer, 5)
+    assert env.queue_size == 2 and env.scheduled == 3
+    env.run()
+    assert calls == ['other', 5]
+    with pytest.raises(ValueError):
+        env.rearm(timer, 1)
+
+
+def test_rearm_of_a_cancelled_timer_fails(env):
+    timer = env.call_later(1, print)
+    env.cancel(timer)
+    with pytest.raises(ValueError):
+        env.rearm(timer, 1)
+
+
+# The queue is compacted once more than half of it is cancelled
+def test_cancelled_timers_are_compacted(env):
+    calls = []
+    timers = [env.call_later(delay, calls.append, delay) for delay in range(10)]
+    for timer in timers[:5]:
+        env.cancel(timer)
+    assert len(env._queue) == 10 and env.queue_size == 5
+    env.cancel(timers[5])
+    assert len(env._queue) == 4 and env.queue_size == 4
+    assert env.peek() == 6
+    env.run()
+    assert calls == [6, 7, 8, 9]
+
+
+def test_queue_size_counts_the_live_timers(env):
+    for delay in (1, 2, 3):
+        env.call_later(delay, lambda: None)
+    env.run(until=2.5)
+    assert env.now == 2.5 and env.queue_size == 1
+    env.run()
+    assert env.queue_size == 0 and env.peek() == float('inf')
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:13:46 2026
+"""
+
+import pandas as pd
+
+from plum_log import EventKey, LogSink, SimulationLog
+
+
+class FrameSink(LogSink):
+    def __init__(self):
+        super().__init__()
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame.copy())
+        super().write(frame)
+
+
+def log_events(log, n):
+    for i in range(n):
+        key = EventKey(i % 3, 1000 * i, (i + 1) % 3, 1000 * i + 500)
+        log.log_event(float(i), 'A', 'Alerted', 'ChangeStatus', 'ConfirmedAlert', 'NaN',
+                      'StatusToAlerted', 'NaN', key)
+
+
+# Every chunk only codes its own event keys and renders the same IDs
+def test_event_keys_are_coded_per_chunk():
+    full = SimulationLog(sensor_ids=['A', 'B', 'C'])
+    log_events(full, 10)
+    sink = FrameSink()
+    chunked = SimulationLog(sensor_ids=['A', 'B', 'C'], sink=sink, chunk_size=4)
+    log_events(chunked, 10)
+    chunked.flush()
+    assert all(len(frame.event_id.cat.categories) <= 4 for frame in sink.frames)
+    merged = pd.concat(sink.frames, ignore_index=True)
+    assert list(merged.event_id.astype(str)) == list(full.to_dataframe().event_id.astype(str))
+
+
+def test_clear_drops_the_event_keys():
+    log = SimulationLog(sensor_ids=['A', 'B', 'C'])
+    for _ in range(3):
+        log.clear()
+        log_events(log, 10)
+    assert len(log.categories['event_key']) == 10
+    log.clear()
+    assert not log.categories['event_key'] and not log.lookup['event_key']
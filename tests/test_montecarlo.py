@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:00:12 2026
+"""
+
+import numpy as np
+
+from plum_montecarlo import draw_realisations, run_monte_carlo
+from plum_streams import realisation_streams
+
+
+# A shard gives the same realisations as the full run, on any backend
+def test_shards_reproduce_the_full_run(network, earthquakes):
+    first = earthquakes.iloc[0]
+    epicenter = (first.latitude, first.longitude)
+    full = run_monte_carlo(network, epicenter, 12, seed=3, backend='simpy')
+    shard = run_monte_carlo(network, epicenter, 7, seed=3, backend='heap', first=5)
+    np.testing.assert_array_equal(shard.n_alerted, full.n_alerted[5:])
+    np.testing.assert_array_equal(shard.first_alert, full.first_alert[5:])
+    np.testing.assert_array_equal(shard.n_false_triggers, full.n_false_triggers[5:])
+
+
+# The batched draws are the draws of the realisation streams, whatever the batches
+def test_batches_reproduce_the_streams(network, earthquakes):
+    first = earthquakes.iloc[0]
+    epicenter = (first.latitude, first.longitude)
+    missed, false_triggers, peaks = draw_realisations(3, np.arange(4, 9), len(network.sensors), 120, 0.2, 0.1)
+    for row, r in enumerate(range(4, 9)):
+        streams = realisation_streams(3, r, len(network.sensors))
+        expected_missed, expected_false = streams.noise(0.2, 0.1, 120)
+        np.testing.assert_array_equal(missed[row], expected_missed)
+        np.testing.assert_array_equal(false_triggers[row], expected_false)
+        assert peaks[row].tolist() == [streams.peak(i) for i in range(len(network.sensors))]
+    whole = run_monte_carlo(network, epicenter, 10, seed=3, batch_size=10)
+    batched = run_monte_carlo(network, epicenter, 10, seed=3, batch_size=3)
+    np.testing.assert_array_equal(batched.n_alerted, whole.n_alerted)
+    np.testing.assert_array_equal(batched.first_alert, whole.first_alert)
+    np.testing.assert_array_equal(batched.alert_count, whole.alert_count)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:57:37 2026
+"""
+
+import glob
+import os
+
+import pandas as pd
+import pytest
+
+import plum_runner
+from conftest import SENSORS
+
+
+@pytest.fixture
+def catalogue(earthquakes):
+    first = earthquakes.iloc[0]
+    return pd.DataFrame({'id': ['eq_a', 'eq_b', 'eq_c'], 'latitude': first.latitude,
+                         'longitude': [first.longitude, first.longitude + 0.2, first.longitude - 0.2]})
+
+
+def test_resume_gives_the_same_log(tmp_path, catalogue):
+    partitions = str(tmp_path)
+    full = plum_runner.run_scenarios(catalogue, SENSORS, workers=1, partition_dir=partitions)
+    # a run stopped after the first scenario, while it was writing the second
+    for path in sorted(glob.glob(os.path.join(partitions, '*.pkl')))[1:]:
+        os.rename(path, path + '.tmp')
+    resumed = plum_runner.run_scenarios(catalogue, SENSORS, workers=1, partition_dir=partitions,
+                                        resume=True)
+    pd.testing.assert_frame_equal(resumed, full)
+    assert not glob.glob(os.path.join(partitions, '*.tmp'))
+
+
+def test_resume_without_checkpoint_keeps_the_partitions(tmp_path, catalogue):
+    partitions = str(tmp_path)
+    plum_runner.run_scenarios(catalogue, SENSORS, workers=1, partition_dir=partitions)
+    os.remove(plum_runner.checkpoint_path(partitions))
+    with pytest.raises(FileNotFoundError):
+        plum_runner.run_scenarios(catalogue, SENSORS, workers=1, partition_dir=partitions, resume=True)
+    assert plum_runner.completed_scenarios(partitions) == [0, 1, 2]
+
+
+def test_stop_reason_is_kept_per_scenario(tmp_path, catalogue):
+    merged = plum_runner.run_scenarios(catalogue, SENSORS, workers=1, partition_dir=str(tmp_path))
+    scenarios = merged.attrs['scenarios']
+    assert [s['eq_id'] for s in scenarios] == list(catalogue.id)
+    assert all(s['stop_reason'] in ('quiescent', 'horizon') for s in scenarios)
+
+    output = str(tmp_path / 'log.csv')
+    with plum_runner.open_sink(output) as sink:
+        plum_runner.run_scenarios(catalogue, SENSORS, workers=1, sink=sink)
+    metadata = pd.read_csv(str(tmp_path / 'log_metadata.csv'))
+    assert list(metadata.eq_id) == list(catalogue.id)
+    assert list(metadata.stop_time) == pytest.approx([s['stop_time'] for s in scenarios])
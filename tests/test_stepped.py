@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:00:38 2026
+"""
+
+import pytest
+
+from plum_stepped import compare_with_des
+from plum_synthetic import synthetic_network
+
+
+# The stepped engine alerts the same sensors as the DES, at most dt earlier
+@pytest.mark.parametrize('backend', ['simpy', 'heap'])
+def test_stepped_matches_des(network, earthquakes, backend):
+    first = earthquakes.iloc[0]
+    sensors, summary = compare_with_des(network, (first.latitude, first.longitude), backend=backend)
+    assert summary['alerted_des'] > 0
+    assert summary['decision_mismatches'] == 0
+    assert sensors.within_bound.all()
+
+
+def test_stepped_matches_des_on_a_synthetic_network():
+    centre = (-41.0, 175.0)
+    network = synthetic_network(2000, 0.02, centre=centre)
+    sensors, summary = compare_with_des(network, centre, backend='heap')
+    assert summary['alerted_des'] > 0
+    assert sensors.within_bound.all()
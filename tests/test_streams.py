@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:16:15 2026
+"""
+
+import numpy as np
+
+from plum_streams import ScenarioStreams, philox4x32
+
+
+# Known answers of Philox4x32-10 (Random123)
+def test_philox_known_answers():
+    cases = [((0, 0, 0, 0), (0, 0), (0x6627e8d5, 0xe169c58d, 0xbc57ac4c, 0x9b00dbd8)),
+             ((0xffffffff,) * 4, (0xffffffff,) * 2, (0x408f276d, 0x41c83b0e, 0xa20bc7c6, 0x6d5451fd)),
+             ((0x243f6a88, 0x85a308d3, 0x13198a2e, 0x03707344), (0xa4093822, 0x299f31d0),
+              (0xd16cfe09, 0x94fdcceb, 0x5001e420, 0x24126ea1))]
+    for counter, key, expected in cases:
+        assert tuple(int(word) for word in philox4x32(counter, key)) == expected
+
+
+# The draws of a sensor do not depend on the size of the network
+def test_draws_do_not_depend_on_the_number_of_sensors():
+    draws = []
+    for n_sensors in (27, 28, 1000):
+        streams = ScenarioStreams(7, n_sensors)
+        draws.append([streams.peak(0) for _ in range(10)] + [streams.random(3) for _ in range(10)])
+    assert draws[0] == draws[1] == draws[2]
+
+
+# The draws of a sensor do not depend on the draws of the others, and a heavy
+# drawer does not change the first batch of the others
+def test_draws_do_not_depend_on_the_order():
+    positions = np.random.default_rng(0).integers(0, 50, 2000).tolist() + [4] * 500
+    per_order = []
+    for order in (positions, positions[::-1]):
+        streams = ScenarioStreams(1, 50)
+        per_sensor = {}
+        for position in order:
+            per_sensor.setdefault(position, []).append(streams.peak(position))
+        per_order.append(per_sensor)
+        assert len(streams._rows['peak']) == streams.batch
+    assert per_order[0] == per_order[1]
+
+
+# The noise draws follow the per-sensor streams and prefilled draws are the same values
+def test_noise_and_prefill_are_the_same_draws():
+    streams = ScenarioStreams(2, 30, realisation=4)
+    streams.next('miss', 5)
+    missed = streams.next_all('miss')
+    assert missed[5] == streams.draw('miss', 5, 1)
+    assert missed[6] == streams.draw('miss', 6, 0)
+    prefilled = ScenarioStreams(2, 30, realisation=4)
+    prefilled.prefill('peak', prefilled.draw('peak', np.arange(30), 0))
+    fresh = ScenarioStreams(2, 30, realisation=4)
+    assert [prefilled.peak(9) for _ in range(6)] == [fresh.peak(9) for _ in range(6)]
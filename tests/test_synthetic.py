@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:59:04 2026
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from plum_loader import read_sensor_table
+from plum_synthetic import KM_PER_DEGREE, synthetic_locations, synthetic_sensors
+
+
+# The density of the network is the one asked for, even past the size of the bbox
+@pytest.mark.parametrize('density', [0.01, 0.05])
+def test_density_is_not_clipped(density):
+    n = 100000
+    lat, lon = synthetic_locations(n, density)
+    # the square around New Zealand crosses the antimeridian
+    area = np.ptp(lat) * KM_PER_DEGREE * np.ptp(lon % 360) * KM_PER_DEGREE * math.cos(math.radians(lat.mean()))
+    assert n / area == pytest.approx(density, rel=0.05)
+
+
+# A synthetic network across the antimeridian is a valid sensors file
+def test_synthetic_file_loads(tmp_path):
+    path = str(tmp_path / 'sensors.csv')
+    sensors = synthetic_sensors(100000, 0.01)
+    assert sensors.longitude.max() < 180 and sensors.longitude.min() >= -180
+    assert (sensors.longitude < 0).any()
+    sensors.to_csv(path, index=False)
+    ids, lat, lon = read_sensor_table(path)
+    assert ids.tolist() == sensors.id.tolist()
+    np.testing.assert_allclose(lat, sensors.latitude)
+    np.testing.assert_allclose(lon, sensors.longitude)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:20:00 2026
+"""
+
+import numpy as np
+import pytest
+
+from plum_geodesy import haversine_km
+from plum_topology import NeighbourIndex
+
+RANGES = (10, 30, 75)
+
+
+# 3000 random sensors on both sides of the antimeridian
+@pytest.fixture(scope='module')
+def locations():
+    rng = np.random.default_rng(1)
+    lat = rng.uniform(-42, -38, 3000)
+    lon = (rng.uniform(178, 182, 3000) + 180) % 360 - 180
+    return np.column_stack((lat, lon))
+
+
+# The CSR adjacency of every range by comparing every pair
+@pytest.fixture(scope='module')
+def brute_force(locations):
+    lat, lon = locations.T
+    distances = haversine_km(lat[:, None], lon[:, None], lat, lon)
+    adjacency = {}
+    for range_km in RANGES:
+        in_range = (distances <= range_km) & ~np.eye(len(lat), dtype=bool)
+        indptr = np.concatenate(([0], np.cumsum(in_range.sum(axis=1))))
+        rows, columns = np.nonzero(in_range)
+        adjacency[range_km] = indptr, columns, distances[rows, columns]
+    return adjacency
+
+
+def assert_same_adjacency(adjacency, expected):
+    np.testing.assert_array_equal(adjacency[0], expected[0])
+    np.testing.assert_array_equal(adjacency[1], expected[1])
+    np.testing.assert_allclose(adjacency[2], expected[2], rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('range_km', RANGES)
+def test_neighbours_match_brute_force(locations, brute_force, range_km):
+    index = NeighbourIndex(locations)
+    expected = brute_force[range_km]
+    assert np.any(locations[:, 1] < 0) and np.any(locations[:, 1] > 0)
+    assert len(expected[1]) > 0
+    assert_same_adjacency(index.adjacency(range_km), expected)
+    i = int(np.argmax(np.diff(expected[0])))
+    np.testing.assert_array_equal(index.neighbours(i, range_km), expected[1][expected[0][i]:expected[0][i + 1]])
+
+
+# The smaller ranges cut out of the largest one (_restrict) are the same as built
+def test_restricted_ranges_match_brute_force(locations, brute_force):
+    index = NeighbourIndex(locations)
+    index.adjacency(max(RANGES))
+    for range_km in sorted(RANGES, reverse=True)[1:]:
+        assert_same_adjacency(index.adjacency(range_km), brute_force[range_km])
+        assert_same_adjacency(NeighbourIndex._restrict(brute_force[max(RANGES)], range_km), brute_force[range_km])
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 08:57:17 2026
+"""
+
+import numpy as np
+import pytest
+
+from plum_trigger import TriggerPipeline, recursive_average
+from plum_waveforms import WaveformSource, write_synthetic_records
+
+
+@pytest.fixture
+def records(tmp_path, network, earthquakes):
+    first = earthquakes.iloc[0]
+    write_synthetic_records(str(tmp_path), network.topology, (first.latitude, first.longitude),
+                            duration=120)
+    return WaveformSource(str(tmp_path))
+
+
+@pytest.mark.parametrize('c', [1 / 50, 1 / 1000, 1.0])
+def test_recursive_average_matches_the_recursion(c):
+    x = np.random.default_rng(0).random((3, 2500)) ** 2
+    averages, state = recursive_average(x, c, np.full(3, 0.5))
+    expected = np.empty_like(x)
+    y = np.full(3, 0.5)
+    for k in range(x.shape[1]):
+        y = (1 - c) * y + c * x[:, k]
+        expected[:, k] = y
+    np.testing.assert_allclose(averages, expected, rtol=1e-12)
+    np.testing.assert_allclose(state, y, rtol=1e-12)
+
+
+# The LTA warms up from start, so a later start only drops the picks before it
+@pytest.mark.parametrize('start', [0, 20])
+def test_picks_do_not_depend_on_the_chunks(records, network, start):
+    reference = TriggerPipeline(records, network.topology.ids).picks(start, 120)
+    for chunk_samples in (137, 1000):
+        positions, times = TriggerPipeline(records, network.topology.ids,
+                                           chunk_samples=chunk_samples).picks(start, 120)
+        np.testing.assert_array_equal(positions, reference[0])
+        np.testing.assert_allclose(times, reference[1])
+    assert len(reference[0]) > 0 and np.all(reference[1] >= start + 10)
+
+
+# The LTA of a later start has not seen the noise before it, which can move a
+# pick by a sample
+def test_later_start_gives_the_same_picks(records, network):
+    full = TriggerPipeline(records, network.topology.ids).picks(0, 120)
+    later = TriggerPipeline(records, network.topology.ids).picks(20, 120)
+    # no pick of the synthetic records is in the first 30 s
+    assert full[1].min() > 30
+    np.testing.assert_array_equal(later[0], full[0])
+    np.testing.assert_allclose(later[1], full[1], atol=1.5 / records.sampling_rate)